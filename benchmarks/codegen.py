@@ -0,0 +1,46 @@
+"""
+Nanoseconds per character of the generated Python matcher next to the
+table-driven CompiledDFA, on DFAs with more and more states
+
+    python -m benchmarks.codegen
+"""
+
+import random
+import timeit
+
+from computation.automata.codegen import python_function, python_source
+from computation.automata.nfa import NFASimulation
+from computation.automata.pattern import Choose, Concatenate, Literal, Repeat
+
+LENGTH = 100_000
+
+
+def nth_from_last(n: int):
+    # (a|b)*a(a|b){n}, the minimal DFA has 2 ** (n + 1) states
+    ab = Choose(Literal("a"), Literal("b"))
+    pattern = Concatenate(Repeat(ab), Literal("a"))
+    for _ in range(n):
+        pattern = Concatenate(pattern, ab)
+    return NFASimulation(pattern.to_nfa_design, minimize=True).to_dfa_design
+
+
+def ns_per_char(match, string: str) -> float:
+    seconds = min(timeit.repeat(lambda: match(string), number=3, repeat=3)) / 3
+    return seconds / len(string) * 1e9
+
+
+def main():
+    string = "".join(random.choice("ab") for _ in range(LENGTH))
+    print(f"{'states':>8}{'table':>10}{'python':>10}")
+    for n in range(0, 10, 3):
+        compiled = nth_from_last(n).compile()
+        match = python_function(python_source(compiled))
+        print(
+            f"{compiled.state_count:>8}"
+            f"{ns_per_char(compiled.accepts, string):>10.1f}"
+            f"{ns_per_char(match, string):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
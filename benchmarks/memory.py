@@ -0,0 +1,55 @@
+"""
+Bytes per instance of the slotted rule and configuration classes, next to
+plain dataclasses with the same fields
+
+    python -m benchmarks.memory
+"""
+
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from computation.automata.farule import FARule
+from computation.automata.pda import PDAConfiguration, PDARule, Stack
+from computation.interpreter.expressions import Add, Number
+from computation.turing_machine.rule import Direction, TMRule
+from computation.turing_machine.tape import Tape, TMConfiguration
+
+COUNT = 100_000
+
+stack = Stack(["$"])
+tape = Tape(["1"], "0", [], "_")
+SAMPLES = [
+    (FARule, (1, "a", 2)),
+    (PDARule, (1, "(", 2, "$", ["b", "$"])),
+    (PDAConfiguration, (1, stack)),
+    (TMRule, (1, "0", 2, "1", Direction.RIGHT)),
+    (Tape, (["1"], "0", [], "_")),
+    (TMConfiguration, (1, tape)),
+    (Number, (1,)),
+    (Add, (Number(1), Number(2))),
+]
+
+
+def bytes_per_instance(cls, args) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(*args) for _ in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / COUNT
+
+
+def main():
+    print(f"{'class':<18}{'__dict__':>10}{'slots':>10}")
+    for cls, args in SAMPLES:
+        plain = make_dataclass(cls.__name__, [(f.name, f.type) for f in fields(cls)])
+        print(
+            f"{cls.__name__:<18}"
+            f"{bytes_per_instance(plain, args):>10.0f}"
+            f"{bytes_per_instance(cls, args):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Iterable
+
+from .charclass import Alphabet, representative
+from .compiled import Input, as_text
+from .farule import State
+
+if TYPE_CHECKING:
+    from .nfa import NFADesign
+
+CHUNK_BITS = 8
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def _mask(numbers: dict[State, int], states: Iterable[State]) -> int:
+    mask = 0
+    for state in states:
+        mask |= 1 << numbers[state]
+    return mask
+
+
+def _chunk_tables(moves: list[int], size: int) -> list[list[int]]:
+    # table k maps the bits of chunk k of a mask to the union of their moves
+    tables = []
+    for offset in range(0, size, CHUNK_BITS):
+        table = [0] * (CHUNK_MASK + 1)
+        for bits in range(1, CHUNK_MASK + 1):
+            low = (bits & -bits).bit_length() - 1
+            if offset + low < size:
+                table[bits] = table[bits & (bits - 1)] | moves[offset + low]
+            else:
+                table[bits] = table[bits & (bits - 1)]
+        tables.append(table)
+    return tables
+
+
+def _lookup(tables: list[list[int]], states: int) -> int:
+    next_states = 0
+    for table in tables:
+        if not states:
+            break
+        next_states |= table[states & CHUNK_MASK]
+        states >>= CHUNK_BITS
+    return next_states
+
+
+@dataclass(frozen=True)
+class BitNFA:
+    """
+    NFA simulation over state sets packed into the bits of an int
+    """
+
+    size: int
+    start: int
+    accept: int
+    alphabet: Alphabet
+    # symbol -> successor mask of each state, closed over free moves
+    moves: list[list[int]]
+    # character -> per 8-bit chunk lookup tables of its symbol, built on
+    # first use, with no tables for characters outside the alphabet
+    tables: dict[str, list[list[int]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    symbol_tables: dict[int, list[list[int]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    # the same for the states with a move into a mask
+    reverse_tables: dict[str, list[list[int]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+    numbers: dict[State, int] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_design(cls, design: NFADesign) -> BitNFA:
+        rulebook = design.rulebook
+        numbers: dict[State, int] = {}
+        for state in [design.start_state, *design.accept_states]:
+            numbers.setdefault(state, len(numbers))
+        for rule in rulebook.rules:
+            numbers.setdefault(rule.state, len(numbers))
+            numbers.setdefault(rule.next_state, len(numbers))
+
+        closures = [
+            _mask(numbers, rulebook.follow_free_moves([state])) for state in numbers
+        ]
+        moves = []
+        for symbol in rulebook.classes.symbols:
+            row = []
+            for state in numbers:
+                mask = 0
+                for next_state in rulebook.follow_rules_for(
+                    state, representative(symbol)
+                ):
+                    mask |= closures[numbers[next_state]]
+                row.append(mask)
+            moves.append(row)
+
+        return cls(
+            size=len(numbers),
+            start=closures[0],
+            accept=_mask(numbers, design.accept_states),
+            alphabet=rulebook.classes,
+            moves=moves,
+            numbers=numbers,
+        )
+
+    def mask(self, states: Iterable[State]) -> int:
+        return _mask(self.numbers, states)
+
+    def chunk_tables(self, symbol: int) -> list[list[int]]:
+        tables = self.symbol_tables.get(symbol)
+        if tables is None:
+            tables = self.symbol_tables[symbol] = _chunk_tables(
+                self.moves[symbol], self.size
+            )
+        return tables
+
+    def step(self, states: int, character: str) -> int:
+        tables = self.tables.get(character)
+        if tables is None:
+            symbol = self.alphabet.index(character)
+            tables = [] if symbol is None else self.chunk_tables(symbol)
+            self.tables[character] = tables
+        return _lookup(tables, states)
+
+    @cached_property
+    def reverse_moves(self) -> list[list[int]]:
+        # symbol -> the states with a move into each state
+        reverse_moves = []
+        for moves in self.moves:
+            row = [0] * self.size
+            for state, mask in enumerate(moves):
+                while mask:
+                    low = mask & -mask
+                    row[low.bit_length() - 1] |= 1 << state
+                    mask ^= low
+            reverse_moves.append(row)
+        return reverse_moves
+
+    def reverse_step(self, states: int, character: str) -> int:
+        tables = self.reverse_tables.get(character)
+        if tables is None:
+            symbol = self.alphabet.index(character)
+            tables = []
+            if symbol is not None:
+                tables = _chunk_tables(self.reverse_moves[symbol], self.size)
+            self.reverse_tables[character] = tables
+        return _lookup(tables, states)
+
+    def accepting(self, states: int) -> bool:
+        return bool(states & self.accept)
+
+    def run(self, states: int, string: Input) -> int:
+        for c in as_text(string):
+            if not states:
+                break
+            states = self.step(states, c)
+        return states
+
+    def accepts(self, string: Input) -> bool:
+        return self.accepting(self.run(self.start, string))
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import product
+from typing import TYPE_CHECKING, Hashable, Iterator, Optional, Sequence
+
+from ..utils import group_by
+from .compiled import Input, as_text
+from .farule import State
+
+if TYPE_CHECKING:
+    from .pda import NPDADesign, PDARule
+
+
+@dataclass(frozen=True)
+class Marker:
+    # a symbol no input character can be equal to
+    name: str
+
+    def __repr__(self):
+        return self.name
+
+
+# [p X TOP] derives what leads from p to acceptance without popping X
+TOP = Marker("⊤")
+START = Marker("S")
+
+# [p X q] for a PDA, X is None for the empty stack and q may be TOP
+Nonterminal = tuple[State, Optional[str], State]
+# (production, dot, origin)
+Item = tuple[int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class Production:
+    head: Hashable
+    body: tuple[Hashable, ...]
+
+
+@dataclass
+class Grammar:
+    """
+    A context-free grammar, a symbol is a nonterminal when some production
+    has it as head and a terminal otherwise
+    """
+
+    start: Hashable
+    productions: list[Production]
+
+    @cached_property
+    def alternatives(self) -> dict[Hashable, list[int]]:
+        # built on first use, productions should not be mutated afterwards
+        return group_by(
+            list(range(len(self.productions))), lambda k: self.productions[k].head
+        )
+
+    @cached_property
+    def nullable(self) -> frozenset[Hashable]:
+        nullable: set[Hashable] = set()
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                if production.head not in nullable and all(
+                    symbol in nullable for symbol in production.body
+                ):
+                    nullable.add(production.head)
+                    changed = True
+        return frozenset(nullable)
+
+    @classmethod
+    def from_npda(cls, design: NPDADesign) -> Grammar:
+        return cls(START, _npda_productions(design))
+
+    def accepts(self, string: Input) -> bool:
+        return _Earley(self, as_text(string)).run()
+
+
+def _chains(
+    states: Sequence[Hashable], first: Hashable, symbols: Sequence, last: Hashable
+) -> Iterator[tuple]:
+    # [first Y1 s1][s1 Y2 s2] ... [sk-1 Yk last] for every choice of s1..sk-1
+    for middle in product(states, repeat=len(symbols) - 1):
+        ends = (first, *middle, last)
+        yield tuple((ends[i], symbol, ends[i + 1]) for i, symbol in enumerate(symbols))
+
+
+def _pushed(rule: PDARule) -> tuple:
+    # the characters on top after the rule, topmost first; on an empty
+    # stack nothing is popped, as if the empty stack marker were pushed back
+    push = tuple(rule.push_characters)
+    return push if rule.pop_character is not None else push + (None,)
+
+
+def _bodies(
+    nonterminal: Nonterminal, rule: PDARule, states: list[State]
+) -> Iterator[tuple]:
+    _, _, last = nonterminal
+    read = () if rule.character is None else (rule.character,)
+    push = _pushed(rule)
+    if last is not TOP:
+        if not push:
+            if rule.next_state == last:
+                yield read
+            return
+        for chain in _chains(states, rule.next_state, push, last):
+            yield read + chain
+        return
+
+    # pop the first i - 1 characters, then accept above the i-th
+    for i in range(1, len(push) + 1):
+        for chain in _chains(states, rule.next_state, push[:i], TOP):
+            yield read + chain
+
+
+def _npda_productions(design: NPDADesign) -> list[Production]:
+    """
+    Nonterminal [p X q] derives what takes the NPDA from state p with X on
+    top to state q with X popped. Only productions of nonterminals reachable
+    from the start symbol are generated
+    """
+    rules = design.rulebook.rules
+    accept_states = set(design.accept_states)
+    states = list(
+        dict.fromkeys(
+            [design.start_state, *design.accept_states]
+            + [s for rule in rules for s in (rule.state, rule.next_state)]
+        )
+    )
+    rules_for: dict[tuple[State, Optional[str]], list[PDARule]] = group_by(
+        rules, lambda rule: (rule.state, rule.pop_character)
+    )
+
+    # accept above the bottom character, or pop it and accept on an
+    # empty stack
+    start: Nonterminal = (design.start_state, design.bottom_character, TOP)
+    productions = [Production(START, (start,))] + [
+        Production(
+            START, ((design.start_state, design.bottom_character, q), (q, None, TOP))
+        )
+        for q in states
+    ]
+    seen: set[Nonterminal] = set()
+    pending = [s for p in productions for s in p.body if isinstance(s, tuple)]
+    while pending:
+        nonterminal = pending.pop()
+        if nonterminal in seen:
+            continue
+        seen.add(nonterminal)
+        state, top, last = nonterminal
+        if last is TOP and state in accept_states:
+            productions.append(Production(nonterminal, ()))
+        for rule in rules_for.get((state, top), ()):
+            for body in _bodies(nonterminal, rule, states):
+                productions.append(Production(nonterminal, body))
+                pending += [s for s in body if isinstance(s, tuple)]
+    return productions
+
+
+class _Earley:
+    """
+    Earley recognition with the Aycock-Horspool treatment of nullable
+    nonterminals. An item is (production, dot, origin) and each position
+    has its own item set, with the items waiting on each nonterminal
+    """
+
+    def __init__(self, grammar: Grammar, text: str):
+        self.grammar = grammar
+        self.text = text
+        self.sets: list[set[Item]] = [set() for _ in range(len(text) + 1)]
+        self.waiting: list[dict[Hashable, list[Item]]] = [
+            {} for _ in range(len(text) + 1)
+        ]
+        self.pending: list[Item] = []
+
+    def add(self, i: int, item: Item):
+        if item not in self.sets[i]:
+            self.sets[i].add(item)
+            self.pending.append(item)
+
+    def predict(self, i: int, item: Item, symbol: Hashable):
+        self.waiting[i].setdefault(symbol, []).append(item)
+        for k in self.grammar.alternatives[symbol]:
+            self.add(i, (k, 0, i))
+        if symbol in self.grammar.nullable:
+            k, dot, origin = item
+            self.add(i, (k, dot + 1, origin))
+
+    def complete(self, i: int, head: Hashable, origin: int):
+        for k, dot, start in self.waiting[origin].get(head, ()):
+            self.add(i, (k, dot + 1, start))
+
+    def process(self, i: int, item: Item):
+        k, dot, origin = item
+        production = self.grammar.productions[k]
+        if dot == len(production.body):
+            self.complete(i, production.head, origin)
+            return
+        symbol = production.body[dot]
+        if symbol in self.grammar.alternatives:
+            self.predict(i, item, symbol)
+        elif i < len(self.text) and self.text[i] == symbol:
+            self.sets[i + 1].add((k, dot + 1, origin))
+
+    def run(self) -> bool:
+        for k in self.grammar.alternatives.get(self.grammar.start, ()):
+            self.sets[0].add((k, 0, 0))
+        for i in range(len(self.text) + 1):
+            self.pending = list(self.sets[i])
+            while self.pending:
+                self.process(i, self.pending.pop())
+            if i < len(self.text) and not self.sets[i + 1]:
+                return False
+
+        productions = self.grammar.productions
+        return any(
+            origin == 0
+            and productions[k].head == self.grammar.start
+            and dot == len(productions[k].body)
+            for k, dot, origin in self.sets[-1]
+        )
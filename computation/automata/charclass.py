@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+MAX_CODE_POINT = 0x10FFFF
+
+
+def _normalize(ranges: Iterable[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    merged: list[tuple[int, int]] = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return tuple(merged)
+
+
+@dataclass(frozen=True)
+class CharClass:
+    """
+    A set of characters as sorted, disjoint and inclusive code point ranges
+    """
+
+    ranges: tuple[tuple[int, int], ...]
+
+    @classmethod
+    def of(cls, *specs: str) -> CharClass:
+        # CharClass.of("a-z", "0-9", "_")
+        ranges = []
+        for spec in specs:
+            if len(spec) == 3 and spec[1] == "-":
+                ranges.append((ord(spec[0]), ord(spec[2])))
+            else:
+                ranges.extend((ord(c), ord(c)) for c in spec)
+        return cls(_normalize(ranges))
+
+    def __str__(self):
+        return "[" + "".join(_range_str(low, high) for low, high in self.ranges) + "]"
+
+    def __contains__(self, character: object) -> bool:
+        if not isinstance(character, str) or len(character) != 1:
+            return False
+        code = ord(character)
+        i = bisect_right(self.ranges, (code, MAX_CODE_POINT)) - 1
+        return i >= 0 and self.ranges[i][0] <= code <= self.ranges[i][1]
+
+    @property
+    def first(self) -> str:
+        return chr(self.ranges[0][0])
+
+
+Label = Union[str, CharClass]
+
+ANY = CharClass(((0, MAX_CODE_POINT),))
+
+
+def _range_str(low: int, high: int) -> str:
+    if low == high:
+        return chr(low)
+    return f"{chr(low)}-{chr(high)}"
+
+
+def label_ranges(label: Label) -> tuple[tuple[int, int], ...]:
+    if isinstance(label, CharClass):
+        return label.ranges
+    return ((ord(label), ord(label)),)
+
+
+def representative(label: Label) -> str:
+    return label.first if isinstance(label, CharClass) else label
+
+
+def merge_labels(labels: Iterable[Label]) -> Label:
+    ranges = _normalize(r for label in labels for r in label_ranges(label))
+    if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+        return chr(ranges[0][0])
+    return CharClass(ranges)
+
+
+@dataclass(frozen=True)
+class Alphabet:
+    """
+    Equivalence classes of the characters named by a set of labels: two
+    characters share a symbol when every label contains both or neither.
+    Single characters stay plain strings, so an alphabet without classes
+    is just its sorted characters.
+    """
+
+    symbols: tuple[Label, ...]
+    # sorted disjoint intervals and the symbol each belongs to
+    lows: tuple[int, ...]
+    highs: tuple[int, ...]
+    owners: tuple[int, ...]
+
+    @classmethod
+    def partition(cls, labels: Iterable[Label]) -> Alphabet:
+        events: dict[int, list[tuple[int, int]]] = {}
+        for i, label in enumerate(set(labels)):
+            for low, high in label_ranges(label):
+                events.setdefault(low, []).append((i, 1))
+                events.setdefault(high + 1, []).append((i, -1))
+
+        # sweep the cut points, tracking how many ranges of each label
+        # cover the current interval
+        active: dict[int, int] = {}
+        groups: dict[frozenset[int], list[tuple[int, int]]] = {}
+        points = sorted(events)
+        for point, next_point in zip(points, points[1:]):
+            for i, delta in events[point]:
+                active[i] = active.get(i, 0) + delta
+            signature = frozenset(i for i, count in active.items() if count)
+            if signature:
+                groups.setdefault(signature, []).append((point, next_point - 1))
+
+        return cls.from_groups(list(groups.values()))
+
+    @classmethod
+    def from_groups(cls, groups: list[list[tuple[int, int]]]) -> Alphabet:
+        symbols: list[Label] = []
+        intervals = []
+        for ranges in sorted(_normalize(group) for group in groups):
+            if len(ranges) == 1 and ranges[0][0] == ranges[0][1]:
+                symbols.append(chr(ranges[0][0]))
+            else:
+                symbols.append(CharClass(ranges))
+            intervals += [(low, high, len(symbols) - 1) for low, high in ranges]
+        intervals.sort()
+        return cls(
+            symbols=tuple(symbols),
+            lows=tuple(low for low, _, _ in intervals),
+            highs=tuple(high for _, high, _ in intervals),
+            owners=tuple(owner for _, _, owner in intervals),
+        )
+
+    def index(self, character: str) -> Optional[int]:
+        code = ord(character)
+        i = bisect_right(self.lows, code) - 1
+        if i >= 0 and code <= self.highs[i]:
+            return self.owners[i]
+        return None
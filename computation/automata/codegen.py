@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from .compiled import DEAD_STATE, CompiledDFA, Input
+
+# ranges longer than this are compared, never spelled out in a dict
+DICT_RANGE_LIMIT = 16
+
+
+def _condition(low: int, high: int) -> str:
+    if low == high:
+        return f"c == {chr(low)!r}"
+    return f"{chr(low)!r} <= c <= {chr(high)!r}"
+
+
+def _outgoing(matcher: CompiledDFA, state: int) -> list[tuple[int, int, int]]:
+    # (low, high, next state) for every interval leaving state, adjacent
+    # intervals with the same target merged
+    row = state * matcher.width
+    outgoing: list[tuple[int, int, int]] = []
+    for low, high, column in zip(matcher.lows, matcher.highs, matcher.columns):
+        target = matcher.table[row + column]
+        if target == DEAD_STATE:
+            continue
+        if outgoing and outgoing[-1][1] + 1 == low and outgoing[-1][2] == target:
+            outgoing[-1] = (outgoing[-1][0], high, target)
+        else:
+            outgoing.append((low, high, target))
+    return outgoing
+
+
+def _ranges(state: int, outgoing: list[tuple[int, int, int]]) -> list[str]:
+    # a function comparing c against the long ranges of a state
+    targets: dict[int, list[str]] = {}
+    for low, high, target in outgoing:
+        targets.setdefault(target, []).append(_condition(low, high))
+
+    lines = [f"def R{state}(c):"]
+    for target, conditions in targets.items():
+        lines.append(f"    if {' or '.join(conditions)}:")
+        lines.append(f"        return {target}")
+    lines.append("    return 0")
+    return lines
+
+
+def python_source(matcher: CompiledDFA, name: str = "match") -> str:
+    """
+    Source of a module defining name(string) -> bool. T[state] is a dict
+    from the characters of short ranges to the next state, so each
+    character costs one list index and one dict lookup whatever the number
+    of states; only a miss in a state with long ranges calls R[state],
+    which compares against them
+    """
+    header, rows, ranges = [], [], []
+    for state in range(matcher.state_count):
+        outgoing = _outgoing(matcher, state) if state != DEAD_STATE else []
+        rows.append(
+            {
+                chr(code): target
+                for low, high, target in outgoing
+                if high - low < DICT_RANGE_LIMIT
+                for code in range(low, high + 1)
+            }
+        )
+        long = [t for t in outgoing if t[1] - t[0] >= DICT_RANGE_LIMIT]
+        if long:
+            header += _ranges(state, long) + ["", ""]
+        ranges.append(f"R{state}" if long else "None")
+    header.append(f"T = {rows!r}")
+    header.append(f"R = [{', '.join(ranges)}]")
+
+    accept = [state for state in range(matcher.state_count) if matcher.accepting(state)]
+    body = [
+        f"def {name}(string):",
+        "    if not isinstance(string, str):",
+        '        string = str(string, "latin-1")',
+        "    rows, ranges = T, R",
+        f"    state = {matcher.start}",
+        "    for c in string:",
+        "        next_state = rows[state].get(c)",
+        "        if next_state is None:",
+        "            if ranges[state] is None:",
+        "                return False",
+        "            next_state = ranges[state](c)",
+        "            if not next_state:",
+        "                return False",
+        "        state = next_state",
+        f"    return state in {set(accept)!r}" if accept else "    return False",
+    ]
+    return "\n".join(header + ["", ""] + body) + "\n"
+
+
+def python_function(source: str, name: str = "match") -> Callable[[Input], bool]:
+    namespace: dict[str, object] = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]  # type: ignore[return-value]
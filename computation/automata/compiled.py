@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence, Union
+
+from .charclass import Label, representative
+from .farule import State
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .dfa import DFADesign
+
+# state 0 is the dead state and column 0 collects every character
+# outside the alphabet, so a zeroed table entry means "reject"
+DEAD_STATE = 0
+OTHER_COLUMN = 0
+# accepts_many finishes the last few running strings one by one, so one long
+# string in a batch does not cost a numpy call per character
+BATCH_TAIL = 16
+
+Input = Union[str, bytes, bytearray, memoryview]
+
+
+def _number_states(
+    design: DFADesign, symbols: Sequence[Label]
+) -> tuple[dict[State, int], list[list[int]]]:
+    # reachable states from 1 on, each row holds the next state per symbol
+    numbers: dict[State, int] = {design.start_state: 1}
+    rows: list[list[int]] = [[DEAD_STATE] * len(symbols), [DEAD_STATE] * len(symbols)]
+    pending = [design.start_state]
+    while pending:
+        state = pending.pop()
+        row = rows[numbers[state]]
+        for k, symbol in enumerate(symbols):
+            rule = design.rulebook.rule_for(state, representative(symbol))
+            if rule is None:
+                continue
+            if rule.follow not in numbers:
+                numbers[rule.follow] = len(rows)
+                rows.append([DEAD_STATE] * len(symbols))
+                pending.append(rule.follow)
+            row[k] = numbers[rule.follow]
+    return numbers, rows
+
+
+def _merge_columns(rows: list[list[int]], count: int) -> tuple[list[int], array]:
+    # symbols with the same transitions in every state share a column, and
+    # symbols that always lead to the dead state share the "other" column
+    signatures: dict[tuple[int, ...], int] = {}
+    columns = []
+    for k in range(count):
+        signature = tuple(row[k] for row in rows)
+        if any(signature):
+            columns.append(signatures.setdefault(signature, len(signatures) + 1))
+        else:
+            columns.append(OTHER_COLUMN)
+
+    table = array("i")
+    for number in range(len(rows)):
+        table.append(DEAD_STATE)
+        table.extend(signature[number] for signature in signatures)
+    return columns, table
+
+
+def as_text(string: Input) -> str:
+    # bytes are read as latin-1 characters, matching byte_symbols below
+    return string if isinstance(string, str) else str(string, "latin-1")
+
+
+class _Columns(dict):
+    # character -> column, looked up on first sight and then cached
+    def __init__(self, column: Callable[[str], int]):
+        super().__init__()
+        self.column = column
+
+    def __missing__(self, character: str) -> int:
+        column = self[character] = self.column(character)
+        return column
+
+
+@dataclass(frozen=True)
+class CompiledDFA:
+    start: int
+    accept: int  # bitmap, bit i is set when state i accepts
+    width: int
+    table: Sequence[int]  # row-major, table[state * width + column]
+    # sorted disjoint code point intervals and the column of each
+    lows: Sequence[int]
+    highs: Sequence[int]
+    columns: Sequence[int]
+
+    @classmethod
+    def from_design(cls, design: DFADesign) -> CompiledDFA:
+        alphabet = design.rulebook.classes
+        numbers, rows = _number_states(design, alphabet.symbols)
+        columns, table = _merge_columns(rows, len(alphabet.symbols))
+        width = len(table) // len(rows)
+
+        intervals: list[list[int]] = []
+        for low, high, owner in zip(alphabet.lows, alphabet.highs, alphabet.owners):
+            column = columns[owner]
+            if column == OTHER_COLUMN:
+                continue
+            if intervals and intervals[-1][1] + 1 == low and intervals[-1][2] == column:
+                intervals[-1][1] = high
+            else:
+                intervals.append([low, high, column])
+
+        accept, accept_states = 0, set(design.accept_states)
+        for state, number in numbers.items():
+            if state in accept_states:
+                accept |= 1 << number
+
+        return cls(
+            start=1,
+            accept=accept,
+            width=width,
+            table=table,
+            lows=array("I", [low for low, _, _ in intervals]),
+            highs=array("I", [high for _, high, _ in intervals]),
+            columns=array("i", [column for _, _, column in intervals]),
+        )
+
+    def column(self, character: str) -> int:
+        code = ord(character)
+        i = bisect_right(self.lows, code) - 1
+        if i >= 0 and code <= self.highs[i]:
+            return self.columns[i]
+        return OTHER_COLUMN
+
+    @cached_property
+    def symbols(self) -> dict[str, int]:
+        return _Columns(self.column)
+
+    @cached_property
+    def byte_symbols(self) -> Sequence[int]:
+        # bytes are read as latin-1 characters
+        return array("i", [self.column(chr(b)) for b in range(256)])
+
+    def __getstate__(self):
+        # the per character caches are rebuilt on demand after unpickling,
+        # and views into a memory map are copied out
+        state = dict(self.__dict__)
+        state.pop("symbols", None)
+        state.pop("byte_symbols", None)
+        for name, value in state.items():
+            if isinstance(value, memoryview):
+                state[name] = array(value.format, value)
+        return state
+
+    @property
+    def state_count(self) -> int:
+        return len(self.table) // self.width
+
+    def accepting(self, state: int) -> bool:
+        return bool(self.accept >> state & 1)
+
+    def run(self, state: int, string: Input) -> int:
+        table, width = self.table, self.width
+        if isinstance(string, str):
+            symbols = self.symbols
+            for c in string:
+                state = table[state * width + symbols[c]]
+        else:
+            byte_symbols = self.byte_symbols
+            for b in string:
+                state = table[state * width + byte_symbols[b]]
+        return state
+
+    def accepts(self, string: Input) -> bool:
+        return self.accepting(self.run(self.start, string))
+
+    def accepts_many(self, strings: Iterable[Input]) -> list[bool]:
+        """
+        With numpy installed the strings are stepped together, one position
+        at a time, by a single gather over the flat table instead of a
+        Python loop per string. Otherwise each distinct string is run once
+        """
+        if numpy is not None:
+            return _accepts_batch(self, list(map(as_text, strings)))
+
+        keys = [s if isinstance(s, (str, bytes)) else bytes(s) for s in strings]
+        results = {key: self.accepts(key) for key in dict.fromkeys(keys)}
+        return [results[key] for key in keys]
+
+
+def _columns(matcher: CompiledDFA, codes):
+    # the column of every code point, as CompiledDFA.column
+    columns = numpy.full(len(codes), OTHER_COLUMN, dtype=numpy.int64)
+    if len(matcher.lows):
+        lows = numpy.asarray(matcher.lows, dtype=numpy.int64)
+        highs = numpy.asarray(matcher.highs, dtype=numpy.int64)
+        i = numpy.maximum(numpy.searchsorted(lows, codes, side="right") - 1, 0)
+        inside = (lows[i] <= codes) & (codes <= highs[i])
+        columns[inside] = numpy.asarray(matcher.columns, dtype=numpy.int64)[i[inside]]
+    return columns
+
+
+def _accepts_batch(matcher: CompiledDFA, texts: list[str]) -> list[bool]:
+    lengths = numpy.fromiter(map(len, texts), dtype=numpy.int64, count=len(texts))
+    joined = "".join(texts).encode("utf-32-le", "surrogatepass")
+    columns = _columns(matcher, numpy.frombuffer(joined, dtype=numpy.uint32))
+    # longest first, so the strings still running are always a prefix
+    order = numpy.argsort(-lengths, kind="stable")
+    offsets = (numpy.cumsum(lengths) - lengths)[order]
+    ascending = lengths[order][::-1]
+
+    table = numpy.asarray(matcher.table, dtype=numpy.int64)
+    states = numpy.full(len(texts), matcher.start, dtype=numpy.int64)
+    running, position = len(texts), 0
+    while running > BATCH_TAIL:
+        # the strings no longer than position are done
+        running = len(texts) - int(numpy.searchsorted(ascending, position, "right"))
+        live = states[:running]
+        states[:running] = table[
+            live * matcher.width + columns[offsets[:running] + position]
+        ]
+        position += 1
+    for rank in range(running):
+        text = texts[order[rank]]
+        states[rank] = matcher.run(int(states[rank]), text[position:])
+
+    accepting = numpy.array(
+        [matcher.accepting(state) for state in range(matcher.state_count)]
+    )
+    accepted = numpy.empty(len(texts), dtype=bool)
+    accepted[order] = accepting[states]
+    return accepted.tolist()
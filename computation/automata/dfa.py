@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Optional
+from functools import cached_property
+from typing import Callable, Iterable, Optional, Sequence
 
+from .codegen import python_function, python_source
+from .compiled import CompiledDFA, Input
 from .farule import DFARulebook, State
+from .minimize import hopcroft, minimal_rules, reachable_states, transitions
+from .parallel import accepts_many_parallel
+from .product import Accept, product_rules
 
 
 @dataclass
@@ -38,3 +45,61 @@ class DFADesign:
 
     def accepts(self, string: str) -> bool:
         return self.to_dfa.read_string(string).accepting
+
+    def minimize(self) -> DFADesign:
+        alphabet = list(self.rulebook.classes.symbols)
+        states = reachable_states(self.start_state, self.rulebook, alphabet)
+        table = transitions(states, self.rulebook, alphabet)
+        blocks = hopcroft(table, self.accept_states)
+        accept_states, rules = minimal_rules(
+            self.start_state, self.accept_states, table, blocks
+        )
+        return DFADesign(0, accept_states, DFARulebook(rules))
+
+    @classmethod
+    def product(cls, designs: Sequence[DFADesign], accept: Accept) -> DFADesign:
+        # one pass over the input checks every design
+        start_state, accept_states, rules = product_rules(designs, accept)
+        return cls(start_state, accept_states, DFARulebook(rules))
+
+    def __and__(self, other: DFADesign) -> DFADesign:
+        return DFADesign.product([self, other], all)
+
+    def __or__(self, other: DFADesign) -> DFADesign:
+        return DFADesign.product([self, other], any)
+
+    def __sub__(self, other: DFADesign) -> DFADesign:
+        return DFADesign.product(
+            [self, other], lambda accepted: accepted == (True, False)
+        )
+
+    def __invert__(self) -> DFADesign:
+        # accepts every string over the whole of unicode this one rejects
+        return DFADesign.product([self], lambda accepted: not accepted[0])
+
+    def compile(self) -> CompiledDFA:
+        return CompiledDFA.from_design(self)
+
+    @cached_property
+    def compiled(self) -> CompiledDFA:
+        # built on first use, the design should not be mutated afterwards
+        return self.compile()
+
+    def accepts_many(
+        self,
+        strings: Iterable[Input],
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> list[bool]:
+        if max_workers is None and executor is None:
+            return self.compiled.accepts_many(strings)
+        return accepts_many_parallel(self.compiled, strings, max_workers, executor)
+
+    @property
+    def to_python(self) -> str:
+        return python_source(self.compiled)
+
+    @cached_property
+    def python_matcher(self) -> Callable[[Input], bool]:
+        # compiled once, the design should not be mutated afterwards
+        return python_function(self.to_python)
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, FrozenSet, Iterable, Optional, Union
+from functools import cached_property
+from typing import Any, FrozenSet, Iterable, Iterator, Optional, Union
 
 from ..exceptions import Unreachable
-from ..utils import detect
+from ..utils import group_by
+from .charclass import Alphabet, CharClass, Label
 
 State = Union[int, Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FARule:
     state: State
-    character: Optional[str]
+    character: Optional[Label]
     next_state: State
 
     @property
@@ -23,15 +25,117 @@ class FARule:
         if character is None:
             return self.state == state and self.character is None
 
+        if isinstance(self.character, CharClass):
+            return self.state == state and character in self.character
+
         return self.state == state and self.character == character
 
 
+def _rule_key(rule: FARule) -> tuple[State, Optional[Label]]:
+    return rule.state, rule.character
+
+
+def _class_rules(rules: list[FARule]) -> dict[State, list[FARule]]:
+    return group_by(
+        [rule for rule in rules if isinstance(rule.character, CharClass)],
+        lambda rule: rule.state,
+    )
+
+
+def _classes(rules: list[FARule]) -> Alphabet:
+    return Alphabet.partition(
+        rule.character for rule in rules if rule.character is not None
+    )
+
+
+def strongly_connected_components(
+    graph: dict[State, list[State]],
+) -> list[list[State]]:
+    """
+    Iterative Tarjan, components come out successors first
+    """
+    tarjan = _Tarjan(graph)
+    for root in graph:
+        if root not in tarjan.index:
+            tarjan.run(root)
+    return tarjan.components
+
+
+class _Tarjan:
+    def __init__(self, graph: dict[State, list[State]]):
+        self.graph = graph
+        self.index: dict[State, int] = {}
+        self.low: dict[State, int] = {}
+        self.stack: list[State] = []
+        self.on_stack: set[State] = set()
+        self.frames: list[tuple[State, Iterator[State]]] = []
+        self.components: list[list[State]] = []
+
+    def run(self, root: State) -> None:
+        self.visit(root)
+        while self.frames:
+            node, successors = self.frames[-1]
+            successor = next(successors, None)
+            if successor is None:
+                self.leave(node)
+            elif successor not in self.index:
+                self.visit(successor)
+            elif successor in self.on_stack:
+                self.low[node] = min(self.low[node], self.index[successor])
+
+    def visit(self, node: State) -> None:
+        self.index[node] = self.low[node] = len(self.index)
+        self.stack.append(node)
+        self.on_stack.add(node)
+        self.frames.append((node, iter(self.graph.get(node, ()))))
+
+    def leave(self, node: State) -> None:
+        self.frames.pop()
+        if self.frames:
+            parent = self.frames[-1][0]
+            self.low[parent] = min(self.low[parent], self.low[node])
+        if self.low[node] == self.index[node]:
+            component: list[State] = []
+            while not component or component[-1] != node:
+                component.append(self.stack.pop())
+                self.on_stack.discard(component[-1])
+            self.components.append(component)
+
+
 @dataclass(frozen=True)
 class DFARulebook:
     rules: list[FARule]
 
+    @cached_property
+    def index(self) -> dict[tuple[State, Optional[Label]], list[FARule]]:
+        # built on first lookup, rules should not be mutated afterwards
+        return group_by(self.rules, _rule_key)
+
+    @cached_property
+    def class_rules(self) -> dict[State, list[FARule]]:
+        return _class_rules(self.rules)
+
+    @property
+    def alphabet(self) -> FrozenSet[Label]:
+        return frozenset(
+            [rule.character for rule in self.rules if rule.character is not None]
+        )
+
+    @cached_property
+    def classes(self) -> Alphabet:
+        return _classes(self.rules)
+
     def rule_for(self, state: State, character: Optional[str]) -> Optional[FARule]:
-        return detect(self.rules, lambda rule: rule.applies_to(state, character))
+        # a rule for the exact character wins over character classes
+        rules = self.index.get((state, character))
+        if rules:
+            return rules[0]
+        if character is None:
+            return None
+        for rule in self.class_rules.get(state, ()):
+            if isinstance(rule.character, CharClass) and character in rule.character:
+                return rule
+        return None
 
     def next_state(self, state: State, character: Optional[str]) -> State:
         rule = self.rule_for(state, character)
@@ -44,14 +148,35 @@ class DFARulebook:
 class NFARulebook:
     rules: list[FARule]
 
-    @property
-    def alphabet(self) -> FrozenSet[str]:
+    @cached_property
+    def index(self) -> dict[tuple[State, Optional[Label]], list[FARule]]:
+        # built on first lookup, rules should not be mutated afterwards
+        return group_by(self.rules, _rule_key)
+
+    @cached_property
+    def class_rules(self) -> dict[State, list[FARule]]:
+        return _class_rules(self.rules)
+
+    @cached_property
+    def alphabet(self) -> FrozenSet[Label]:
         return frozenset(
             [rule.character for rule in self.rules if rule.character is not None]
         )
 
+    @cached_property
+    def classes(self) -> Alphabet:
+        return _classes(self.rules)
+
     def rules_for(self, state: State, character: Optional[str]) -> list[FARule]:
-        return [r for r in self.rules if r.applies_to(state, character)]
+        rules = list(self.index.get((state, character), ()))
+        if character is not None:
+            for rule in self.class_rules.get(state, ()):
+                if (
+                    isinstance(rule.character, CharClass)
+                    and character in rule.character
+                ):
+                    rules.append(rule)
+        return rules
 
     def follow_rules_for(self, state: State, character: Optional[str]) -> list[State]:
         return [r.follow for r in self.rules_for(state, character)]
@@ -62,9 +187,22 @@ class NFARulebook:
         next_states = [self.follow_rules_for(s, character) for s in states]
         return frozenset(sum(next_states, []))
 
-    def follow_free_moves(self, states: Iterable[int]) -> Iterable[State]:
-        more_states = self.next_states(states, None)
-        if more_states.issubset(states):
-            return states
-        else:
-            return self.follow_free_moves(more_states.union(states))
+    @cached_property
+    def free_move_closures(self) -> dict[State, FrozenSet[State]]:
+        graph: dict[State, list[State]] = {}
+        for rule in self.rules:
+            if rule.character is None:
+                graph.setdefault(rule.state, []).append(rule.next_state)
+
+        closures: dict[State, FrozenSet[State]] = {}
+        for component in strongly_connected_components(graph):
+            closure = set(component)
+            for state in component:
+                for next_state in graph.get(state, ()):
+                    closure.update(closures.get(next_state, (next_state,)))
+            closures.update(dict.fromkeys(component, frozenset(closure)))
+        return closures
+
+    def follow_free_moves(self, states: Iterable[State]) -> FrozenSet[State]:
+        closures, states = self.free_move_closures, frozenset(states)
+        return states.union(*[closures[s] for s in states if s in closures])
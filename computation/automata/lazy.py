@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterator, Optional
+
+from .bitnfa import BitNFA
+from .compiled import Input, as_text
+
+Row = dict[str, tuple[int, dict]]
+Span = tuple[int, int]
+# nested state masks, one per candidate match end, latest end first
+Chain = tuple[int, ...]
+
+
+@dataclass
+class LazyDFA:
+    """
+    Determinizes a BitNFA on demand: each DFA state is an NFA state mask
+    whose transitions are filled in the first time a character is read.
+
+    Like RE2, the cache is flushed as a whole once it holds `max_states`
+    states, and a run that keeps flushing falls back to NFA stepping.
+    """
+
+    bit_nfa: BitNFA
+    max_states: int = 1024
+    max_flushes: int = 4  # per run, before falling back
+
+    # state mask -> row, a row maps a character to the next mask and its row
+    cache: dict[int, Row] = field(default_factory=dict, repr=False)
+    # the same for the forward and backward passes of search
+    scan_cache: dict[int, dict] = field(default_factory=dict, repr=False)
+    chain_cache: dict[Chain, dict] = field(default_factory=dict, repr=False)
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    fallbacks: int = 0
+
+    @property
+    def start(self) -> int:
+        return self.bit_nfa.start
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "states": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "fallbacks": self.fallbacks,
+        }
+
+    def accepting(self, states: int) -> bool:
+        return self.bit_nfa.accepting(states)
+
+    def row(self, cache: dict, key: Hashable) -> dict:
+        row = cache.get(key)
+        if row is None:
+            if len(cache) >= self.max_states:
+                # emptied rows make runs holding one go back to the cache
+                self.evictions += len(cache)
+                for stale in cache.values():
+                    stale.clear()
+                cache.clear()
+            row = cache[key] = {}
+        return row
+
+    def transitions(self, states: int) -> Row:
+        return self.row(self.cache, states)
+
+    def run(self, states: int, string: Input) -> int:
+        # a hit follows the row stored with the transition, so the state
+        # mask is only hashed on a miss
+        string = as_text(string)
+        step = self.bit_nfa.step
+        hits = misses = flushes = 0
+        row = self.transitions(states)
+        try:
+            for i, c in enumerate(string):
+                entry = row.get(c)
+                if entry is not None:
+                    hits += 1
+                    states, row = entry
+                    continue
+                misses += 1
+                evictions = self.evictions
+                states = step(states, c)
+                row[c] = (states, self.transitions(states))
+                row = row[c][1]
+                if self.evictions == evictions:
+                    continue
+                flushes += 1
+                if flushes > self.max_flushes:
+                    self.fallbacks += 1
+                    return self.bit_nfa.run(states, string[i + 1 :])
+        finally:
+            self.hits += hits
+            self.misses += misses
+        return states
+
+    def accepts(self, string: Input) -> bool:
+        return self.accepting(self.run(self.start, string))
+
+    def longest_matches(self, text: Input, pos: int = 0) -> Iterator[tuple[Span, int]]:
+        """
+        Leftmost-longest matches from pos and the accepting states at their
+        ends, as the text is scanned. A forward pass cuts the text where
+        every thread started before has died, no match crosses such a cut,
+        so each piece is matched on its own by one backward pass for the end
+        of the longest match at each position. Memory is bounded by the
+        longest piece, not the text, and pieces without an accepting state
+        are skipped
+        """
+        text = as_text(text)
+        if pos > len(text):
+            return
+        nfa, cursor, start = self.bit_nfa, pos, pos
+        scan_rows = lambda states: self.row(self.scan_cache, states)
+        chain_rows = lambda chain: self.row(self.chain_cache, chain)
+        for stop, matched in _pieces(nfa, scan_rows, text, pos):
+            if matched:
+                ends = _ends(nfa, chain_rows, text, start, stop)
+                if stop == len(text):
+                    ends.append(stop if nfa.start & nfa.accept else None)
+                cursor = yield from self._matches(text, ends, start, cursor)
+            start = cursor = stop
+
+    def _matches(self, text: str, ends: list[Optional[int]], start: int, cursor: int):
+        while cursor - start < len(ends):
+            end = ends[cursor - start]
+            if end is None:
+                cursor += 1
+                continue
+            yield (
+                (cursor, end),
+                self.run(self.start, text[cursor:end]) & self.bit_nfa.accept,
+            )
+            cursor = end if end > cursor else end + 1
+        return cursor
+
+    def search(self, text: Input, pos: int = 0) -> Optional[Span]:
+        return next(self.finditer(text, pos), None)
+
+    def finditer(self, text: Input, pos: int = 0) -> Iterator[Span]:
+        return (span for span, _ in self.longest_matches(text, pos))
+
+
+def _pieces(
+    nfa: BitNFA, rows: Callable[[int], dict], text: str, pos: int
+) -> Iterator[tuple[int, bool]]:
+    # (stop, whether some thread accepted) for each piece, the last one
+    # stops at the end of the text
+    states, row = nfa.start, rows(nfa.start)
+    matched, stop = bool(nfa.start & nfa.accept), None
+    for i in range(pos, len(text)):
+        entry = row.get(text[i])
+        if entry is None:
+            moved = nfa.step(states, text[i])
+            next_states = moved | nfa.start
+            entry = row[text[i]] = (
+                next_states,
+                not moved,
+                bool(moved & nfa.accept),
+                rows(next_states),
+            )
+        states, died, accepted, row = entry
+        matched = matched or accepted
+        if died:
+            stop = i + 1
+            yield stop, matched
+            matched = bool(nfa.start & nfa.accept)
+    if stop != len(text):
+        yield len(text), matched
+
+
+def _reverse_chain(
+    nfa: BitNFA, chain: Chain, character: str
+) -> tuple[Chain, tuple[int, ...], Optional[int]]:
+    # the levels of the chain, and a new one for matches ending right after
+    # character, read backward over it. Returns the new chain, the levels
+    # dropped, last first, and the first level a match can start from
+    levels = chain + (nfa.accept | (chain[-1] if chain else 0),)
+    next_chain: list[int] = []
+    drops = []
+    for level, states in enumerate(levels):
+        states = nfa.reverse_step(states, character)
+        # empty, or equal to the level of a later end, it adds nothing
+        if states and (not next_chain or next_chain[-1] != states):
+            next_chain.append(states)
+        else:
+            drops.append(level)
+    first = next((k for k, states in enumerate(next_chain) if states & nfa.start), None)
+    return tuple(next_chain), tuple(reversed(drops)), first
+
+
+def _ends(
+    nfa: BitNFA, rows: Callable[[Chain], dict], text: str, start: int, stop: int
+) -> list[Optional[int]]:
+    """
+    The end of the longest match from each position of text[start:stop],
+    read backward. The chain holds, for each candidate end, the states a
+    match ending there or later can be read from, so the masks are nested
+    and the chain is at most nfa.size long; the transitions of a chain are
+    cached like DFA states, and levels pairs each one with its end
+    """
+    ends: list[Optional[int]] = [None] * (stop - start)
+    empty = bool(nfa.start & nfa.accept)
+    chain: Chain = ()
+    row, levels = rows(chain), []
+    for p in range(stop - 1, start - 1, -1):
+        entry = row.get(text[p])
+        if entry is None:
+            next_chain, drops, first = _reverse_chain(nfa, chain, text[p])
+            entry = row[text[p]] = (next_chain, drops, first, rows(next_chain))
+        chain, drops, first, row = entry
+        levels.append(p + 1)
+        for level in drops:
+            del levels[level]
+        if first is not None:
+            ends[p - start] = levels[first]
+        elif empty:
+            ends[p - start] = p
+    return ends
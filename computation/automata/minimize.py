@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+from .charclass import Label, representative
+from .farule import DFARulebook, FARule, State
+
+# stands in for every transition the rulebook leaves out
+SINK = object()
+
+
+def reachable_states(
+    start_state: State, rulebook: DFARulebook, alphabet: Iterable[Label]
+) -> list[State]:
+    states, pending = {start_state: None}, [start_state]
+    while pending:
+        state = pending.pop()
+        for c in alphabet:
+            rule = rulebook.rule_for(state, representative(c))
+            if rule is not None and rule.follow not in states:
+                states[rule.follow] = None
+                pending.append(rule.follow)
+    return list(states)
+
+
+def transitions(
+    states: list[State], rulebook: DFARulebook, alphabet: list[Label]
+) -> dict[State, dict[Label, State]]:
+    table = {}
+    for state in states:
+        rules = [rulebook.rule_for(state, representative(c)) for c in alphabet]
+        table[state] = {
+            c: SINK if rule is None else rule.follow for c, rule in zip(alphabet, rules)
+        }
+    if any(SINK in row.values() for row in table.values()):
+        table[SINK] = {c: SINK for c in alphabet}
+    return table
+
+
+def _preimages(
+    table: dict[State, dict[Label, State]], alphabet: list[Label]
+) -> dict[Label, dict[State, list[State]]]:
+    preimages: dict[Label, dict[State, list[State]]] = {c: {} for c in alphabet}
+    for state, row in table.items():
+        for c, next_state in row.items():
+            preimages[c].setdefault(next_state, []).append(state)
+    return preimages
+
+
+def _split(
+    blocks: list[set], block_of: dict, splitter: set[State]
+) -> list[tuple[int, int]]:
+    touched: dict[int, set[State]] = {}
+    for state in splitter:
+        touched.setdefault(block_of[state], set()).add(state)
+
+    splits = []
+    for b, inside in touched.items():
+        if len(inside) == len(blocks[b]):
+            continue
+        blocks[b] -= inside
+        blocks.append(inside)
+        for state in inside:
+            block_of[state] = len(blocks) - 1
+        splits.append((b, len(blocks) - 1))
+    return splits
+
+
+def hopcroft(
+    table: dict[State, dict[Label, State]], accept_states: Iterable[State]
+) -> list[set[State]]:
+    """
+    Hopcroft's partition refinement, O(n log n) in the number of states
+    """
+    accepting = set(accept_states) & table.keys()
+    blocks = [b for b in (accepting, table.keys() - accepting) if b]
+    block_of = {state: b for b, block in enumerate(blocks) for state in block}
+    alphabet = list(dict.fromkeys(c for row in table.values() for c in row))
+    preimages = _preimages(table, alphabet)
+
+    waiting = {min(range(len(blocks)), key=lambda b: len(blocks[b]))}
+    while waiting:
+        splitter = set(blocks[waiting.pop()])
+        for c in alphabet:
+            sources: set[State] = set()
+            for state in splitter:
+                sources.update(preimages[c].get(state, ()))
+            for old, new in _split(blocks, block_of, sources):
+                if old in waiting or len(blocks[new]) <= len(blocks[old]):
+                    waiting.add(new)
+                else:
+                    waiting.add(old)
+    return blocks
+
+
+def minimal_rules(
+    start_state: State,
+    accept_states: Iterable[State],
+    table: dict[State, dict[Label, State]],
+    blocks: list[set[State]],
+) -> tuple[list[int], list[FARule]]:
+    block_of = {state: b for b, block in enumerate(blocks) for state in block}
+    # a block holding nothing but the sink is left implicit
+    dead = block_of.get(SINK)
+    if dead is not None and len(blocks[dead]) > 1:
+        dead = None
+
+    numbers = {block_of[start_state]: 0}
+    rules, pending = [], deque([block_of[start_state]])
+    while pending:
+        b = pending.popleft()
+        representative = next(s for s in blocks[b] if s is not SINK)
+        for c, next_state in table[representative].items():
+            target = block_of[next_state]
+            if target == dead:
+                continue
+            if target not in numbers:
+                numbers[target] = len(numbers)
+                pending.append(target)
+            rules.append(FARule(numbers[b], c, numbers[target]))
+
+    accepting = set(accept_states)
+    accept_numbers = [
+        n for b, n in numbers.items() if not blocks[b].isdisjoint(accepting)
+    ]
+    return sorted(accept_numbers), rules
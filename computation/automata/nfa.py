@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Optional, Tuple
+from typing import Callable, Iterable, Optional, Tuple
 
+from .bitnfa import BitNFA
+from .charclass import representative
 from .dfa import DFADesign
 from .farule import DFARulebook, FARule, NFARulebook, State
 
@@ -50,10 +52,17 @@ class NFADesign:
     def accepts(self, string: str):
         return self.to_nfa.read_string(string).accepting
 
+    @property
+    def to_bit_nfa(self) -> BitNFA:
+        return BitNFA.from_design(self)
+
 
 @dataclass
 class NFASimulation:
     nfa_design: NFADesign
+    minimize: bool = False
+    # called with (states discovered, rules emitted) after each expansion
+    progress: Optional[Callable[[int, int], None]] = None
 
     def next_state(self, state: Iterable[State], character: Optional[str]):
         return (
@@ -63,23 +72,36 @@ class NFASimulation:
         )
 
     def rules_for(self, state: Iterable[State]) -> list[FARule]:
-        alphabet = self.nfa_design.rulebook.alphabet
+        rulebook = self.nfa_design.rulebook
+        current_states = rulebook.follow_free_moves(frozenset(state))
+        # one rule per alphabet equivalence class rather than per character
         return [
-            FARule(frozenset(state), character, self.next_state(state, character))
-            for character in alphabet
+            FARule(
+                frozenset(state),
+                symbol,
+                rulebook.follow_free_moves(
+                    rulebook.next_states(current_states, representative(symbol))
+                ),
+            )
+            for symbol in rulebook.classes.symbols
         ]
 
     def discover_states_and_rules(
         self, states: frozenset
     ) -> Tuple[Iterable[Iterable[State]], list[FARule]]:
-        rules_list = [self.rules_for(state) for state in states]
-        rules: list[FARule] = sum(rules_list, [])
-        more_states = frozenset([rule.follow for rule in rules])
-
-        if more_states.issubset(states):
-            return states, rules
-        else:
-            return self.discover_states_and_rules(more_states.union(states))
+        # worklist: each subset is expanded exactly once
+        discovered, pending = set(states), list(states)
+        rules: list[FARule] = []
+        while pending:
+            for rule in self.rules_for(pending.pop()):
+                rules.append(rule)
+                if rule.follow not in discovered:
+                    discovered.add(rule.follow)
+                    pending.append(rule.follow)
+            if self.progress is not None:
+                self.progress(len(discovered), len(rules))
+
+        return frozenset(discovered), rules
 
     @property
     def to_dfa_design(self):
@@ -88,4 +110,5 @@ class NFASimulation:
         accept_states = [
             state for state in states if self.nfa_design.to_nfa_from(state).accepting
         ]
-        return DFADesign(start_state, accept_states, DFARulebook(rules))
+        dfa_design = DFADesign(start_state, accept_states, DFARulebook(rules))
+        return dfa_design.minimize() if self.minimize else dfa_design
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Iterable, Optional
+
+from .compiled import CompiledDFA, Input
+
+BLOCK_SIZE = 1 << 12
+# below this, splitting costs more than it saves
+MIN_PARALLEL_SIZE = 1 << 16
+# strings sent to a worker at a time by accepts_many_parallel
+BATCH_SIZE = 256
+
+# the matcher each worker process was started with
+_shared: Any = None
+
+
+def state_map(matcher: CompiledDFA, chunk: Input) -> list[int]:
+    """
+    The state reached at the end of chunk from every possible state.
+    Start states that converge are merged after each block, so a DFA that
+    synchronizes quickly costs little more than a single run.
+    """
+    groups = {state: [state] for state in range(matcher.state_count)}
+    for offset in range(0, len(chunk), BLOCK_SIZE):
+        block = chunk[offset : offset + BLOCK_SIZE]
+        merged: dict[int, list[int]] = {}
+        for state, origins in groups.items():
+            merged.setdefault(matcher.run(state, block), []).extend(origins)
+        groups = merged
+
+    mapping = [0] * matcher.state_count
+    for state, origins in groups.items():
+        for origin in origins:
+            mapping[origin] = state
+    return mapping
+
+
+def run_parallel(
+    matcher: CompiledDFA,
+    string: Input,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> int:
+    workers = max_workers or os.cpu_count() or 1
+    if not string or len(string) < MIN_PARALLEL_SIZE and executor is None:
+        return matcher.run(matcher.start, string)
+
+    size = -(-len(string) // workers)
+    starts = range(0, len(string), size)
+    if isinstance(string, memoryview):
+        # views of a mapped file cannot be pickled, workers get copies
+        chunks: list[Input] = [bytes(string[i : i + size]) for i in starts]
+    else:
+        chunks = [string[i : i + size] for i in starts]
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            mappings = list(pool.map(partial(state_map, matcher), chunks))
+    else:
+        mappings = list(executor.map(partial(state_map, matcher), chunks))
+
+    # compose the per chunk mappings from left to right
+    state = matcher.start
+    for mapping in mappings:
+        state = mapping[state]
+    return state
+
+
+def accepts_parallel(
+    matcher: CompiledDFA,
+    string: Input,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> bool:
+    return matcher.accepting(run_parallel(matcher, string, max_workers, executor))
+
+
+def _share(matcher: Any):
+    global _shared
+    _shared = matcher
+
+
+def _accepts(string: Input) -> bool:
+    return _shared.accepts(string)
+
+
+def _accepts_batch(matcher: Any, strings: list[Input]) -> list[bool]:
+    return [matcher.accepts(string) for string in strings]
+
+
+def accepts_many_parallel(
+    matcher: Any,
+    strings: Iterable[Input],
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> list[bool]:
+    """
+    Runs any matcher with an accepts method over many strings in a process
+    pool. A new pool gets the matcher pickled once per worker. A long-lived
+    executor passed in skips the pool startup, and the matcher goes along
+    with each batch of BATCH_SIZE strings instead
+    """
+    strings = [bytes(s) if isinstance(s, memoryview) else s for s in strings]
+    if executor is not None:
+        batches = [
+            strings[i : i + BATCH_SIZE] for i in range(0, len(strings), BATCH_SIZE)
+        ]
+        results = executor.map(partial(_accepts_batch, matcher), batches)
+        return [accepted for batch in results for accepted in batch]
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_share, initargs=(matcher,)) as pool:
+        return list(pool.map(_accepts, strings, chunksize=BATCH_SIZE))
@@ -1,9 +1,69 @@
+from functools import lru_cache
+from itertools import chain
+
 from .farule import FARule
+from .lazy import LazyDFA
 from .nfa import NFADesign, NFARulebook
 from .state import State
 
+CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_pattern(pattern):
+    # equal patterns share one matcher, see Pattern.__eq__
+    return pattern.optimized.to_lazy_dfa()
+
+
+def concatenation(patterns):
+    # right-nested, skipping empty patterns
+    patterns = [p for p in patterns if not isinstance(p, Empty)]
+    if not patterns:
+        return Empty()
+    result = patterns[-1]
+    for pattern in reversed(patterns[:-1]):
+        result = Concatenate(pattern, result)
+    return result
+
+
+def choice(patterns):
+    # right-nested, without duplicates
+    patterns = list(dict.fromkeys(patterns))
+    if any(p.matches_empty for p in patterns if not isinstance(p, Empty)):
+        patterns = [p for p in patterns if not isinstance(p, Empty)]
+    result = patterns[-1]
+    for pattern in reversed(patterns[:-1]):
+        result = Choose(pattern, result)
+    return result
+
+
+def factor_prefixes(branches):
+    # ab|ac|d -> a(b|c)|d, each branch given as its list of parts
+    groups = {}
+    for parts in branches:
+        head = parts[0] if parts else Empty()
+        groups.setdefault(head, []).append(parts[1:])
+
+    patterns = []
+    for head, tails in groups.items():
+        if len(tails) == 1 or isinstance(head, Empty):
+            patterns.append(concatenation([head] + tails[0]))
+        else:
+            patterns.append(concatenation([head, factor_prefixes(tails)]))
+    return choice(patterns)
+
 
 class Pattern:
+    @property
+    def operands(self):
+        return tuple(vars(self).values())
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.operands == other.operands
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.operands))
+
     def braket(self, outer_precedence):
         if self.precedence < outer_precedence:
             return "(" + str(self) + ")"
@@ -14,7 +74,37 @@ class Pattern:
         return f"/{self}/"
 
     def matches(self, string):
-        return self.to_nfa_design.accepts(string)
+        return self.compile().accepts(string)
+
+    def compile(self):
+        return compile_pattern(self)
+
+    def search(self, text, pos=0):
+        return self.compile().search(text, pos)
+
+    def finditer(self, text, pos=0):
+        return self.compile().finditer(text, pos)
+
+    def count(self, text):
+        return sum(1 for _ in self.finditer(text))
+
+    def to_lazy_dfa(self, max_states=1024):
+        return LazyDFA(self.to_nfa_design.to_bit_nfa, max_states)
+
+    @property
+    def parts(self):
+        return [self]
+
+    @property
+    def branches(self):
+        return [self]
+
+    @property
+    def optimized(self):
+        """
+        An equivalent pattern with fewer NFA states
+        """
+        return self
 
 
 class Empty(Pattern):
@@ -25,6 +115,14 @@ class Empty(Pattern):
     def precedence(self):
         return 3
 
+    @property
+    def matches_empty(self):
+        return True
+
+    @property
+    def parts(self):
+        return []
+
     @property
     def to_nfa_design(self):
         start_state = State()
@@ -44,6 +142,10 @@ class Literal(Pattern):
     def precedence(self):
         return 3
 
+    @property
+    def matches_empty(self):
+        return False
+
     @property
     def to_nfa_design(self):
         start_state = State()
@@ -53,6 +155,30 @@ class Literal(Pattern):
         return NFADesign(start_state, [accept_state], rulebook)
 
 
+class CharacterClass(Pattern):
+    def __init__(self, char_class):
+        self.char_class = char_class
+
+    def __str__(self):
+        return str(self.char_class)
+
+    @property
+    def precedence(self):
+        return 3
+
+    @property
+    def matches_empty(self):
+        return False
+
+    @property
+    def to_nfa_design(self):
+        start_state = State()
+        accept_state = State()
+        rule = FARule(start_state, self.char_class, accept_state)
+        rulebook = NFARulebook([rule])
+        return NFADesign(start_state, [accept_state], rulebook)
+
+
 class Concatenate(Pattern):
     def __init__(self, first, second):
         self.first, self.second = first, second
@@ -64,6 +190,20 @@ class Concatenate(Pattern):
     def precedence(self):
         return 1
 
+    @property
+    def matches_empty(self):
+        return self.first.matches_empty and self.second.matches_empty
+
+    @property
+    def parts(self):
+        return self.first.parts + self.second.parts
+
+    @property
+    def optimized(self):
+        return concatenation(
+            list(chain.from_iterable(p.optimized.parts for p in self.parts))
+        )
+
     @property
     def to_nfa_design(self):
         first_nfa_design, second_nfa_design = (
@@ -96,6 +236,18 @@ class Choose(Pattern):
     def precedence(self):
         return 0
 
+    @property
+    def matches_empty(self):
+        return self.first.matches_empty or self.second.matches_empty
+
+    @property
+    def branches(self):
+        return self.first.branches + self.second.branches
+
+    @property
+    def optimized(self):
+        return factor_prefixes([p.optimized.parts for p in self.branches])
+
     @property
     def to_nfa_design(self):
         first_nfa_design, second_nfa_design = (
@@ -125,6 +277,23 @@ class Repeat(Pattern):
     def precedence(self):
         return 2
 
+    @property
+    def matches_empty(self):
+        return True
+
+    @property
+    def optimized(self):
+        # x** = x*, (|x)* = x* and (x*|y)* = (x|y)*
+        pattern = self.pattern.optimized
+        branches = [
+            p.pattern if isinstance(p, Repeat) else p
+            for p in pattern.branches
+            if not isinstance(p, Empty)
+        ]
+        if not branches:
+            return Empty()
+        return Repeat(choice(branches))
+
     @property
     def to_nfa_design(self):
         pattern_nfa_design = self.pattern.to_nfa_design
@@ -137,3 +306,46 @@ class Repeat(Pattern):
         ] + [FARule(start_state, None, pattern_nfa_design.start_state)]
         rulebook = NFARulebook(rules + extra_rules)
         return NFADesign(start_state, accept_states, rulebook)
+
+
+class PatternSet:
+    """
+    Many patterns joined like Choose into one automaton, with the accept
+    states of each pattern tagged by its index
+    """
+
+    def __init__(self, patterns) -> None:
+        self.patterns = list(patterns)
+        nfa_designs = [pattern.optimized.to_nfa_design for pattern in self.patterns]
+        start_state = State()
+        rules = [FARule(start_state, None, d.start_state) for d in nfa_designs]
+        accept_states = []
+        for nfa_design in nfa_designs:
+            rules += nfa_design.rulebook.rules
+            accept_states += nfa_design.accept_states
+
+        bit_nfa = NFADesign(start_state, accept_states, NFARulebook(rules)).to_bit_nfa
+        self.lazy_dfa = LazyDFA(bit_nfa)
+        self.tags = [bit_nfa.mask(d.accept_states) for d in nfa_designs]
+        # accepting mask -> ids, so a lookup does not scan every tag
+        self.ids_cache: dict[int, list[int]] = {}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def ids(self, states):
+        states &= self.lazy_dfa.bit_nfa.accept
+        ids = self.ids_cache.get(states)
+        if ids is None:
+            if len(self.ids_cache) >= self.lazy_dfa.max_states:
+                self.ids_cache.clear()
+            ids = [i for i, tag in enumerate(self.tags) if states & tag]
+            self.ids_cache[states] = ids
+        return list(ids)
+
+    def matches(self, string):
+        return self.ids(self.lazy_dfa.run(self.lazy_dfa.start, string))
+
+    def finditer(self, text, pos=0):
+        for (start, end), states in self.lazy_dfa.longest_matches(text, pos):
+            yield start, end, self.ids(states)
@@ -1,39 +1,99 @@
-from dataclasses import dataclass
-from typing import Iterable, Optional
+from __future__ import annotations
 
-from ..utils import detect
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Hashable, Iterable, Optional
+
+from ..exceptions import FreeMoveLoop, LimitExceeded
+from ..utils import group_by
+from .cfg import Grammar
+from .compiled import Input, as_text
 from .farule import State
 from .state import State as _State
 
 
-@dataclass(frozen=True)
 class Stack:
-    contents: list[State]
+    """
+    A persistent stack as a chain of cells, so a push or pop shares every
+    cell below the top. Each cell keeps its depth and the hash of the whole
+    stack under it
+    """
+
+    __slots__ = ("_top", "_rest", "depth", "_hash")
+
+    def __init__(self, contents: Iterable[State] = ()):
+        stack = _EMPTY
+        for character in contents:
+            stack = stack.push(character)
+        self._top, self._rest = stack._top, stack._rest
+        self.depth, self._hash = stack.depth, stack._hash
+
+    @classmethod
+    def _cell(cls, top, rest, depth, hash_):
+        stack = cls.__new__(cls)
+        stack._top, stack._rest, stack.depth, stack._hash = top, rest, depth, hash_
+        return stack
 
     def push(self, character):
-        return Stack(self.contents + [character])
+        return Stack._cell(
+            character, self, self.depth + 1, hash((self._hash, character))
+        )
 
     @property
     def pop(self):
-        return Stack(self.contents[:-1])
+        return self._rest if self.depth else self
 
     @property
     def top(self):
-        return self.contents[-1]
+        if not self.depth:
+            raise IndexError("top of an empty stack")
+        return self._top
+
+    @property
+    def contents(self) -> list[State]:
+        contents, stack = [], self
+        while stack.depth:
+            contents.append(stack._top)
+            stack = stack._rest
+        return contents[::-1]
+
+    def __len__(self):
+        return self.depth
+
+    def __eq__(self, other):
+        if not isinstance(other, Stack):
+            return NotImplemented
+        if self.depth != other.depth or self._hash != other._hash:
+            return False
+        a, b = self, other
+        while a is not b:
+            if a._top != b._top:
+                return False
+            a, b = a._rest, b._rest
+        return True
 
     def __hash__(self):
-        return hash(tuple(self.contents))
+        return self._hash
+
+    def __repr__(self):
+        return f"Stack({self.contents!r})"
+
+    def __reduce__(self):
+        return Stack, (self.contents,)
 
 
-@dataclass(eq=True)
+_EMPTY = Stack._cell(None, None, 0, hash(()))
+
+
+@dataclass(slots=True)
 class PDAConfiguration:
     state: State
     stack: Stack
 
-    STUCK_STATE = _State()
+    STUCK_STATE = _State(0)
 
     def __hash__(self):
-        return hash(self.state) ^ hash("".join(self.stack.contents))
+        return hash(self.state) ^ hash(self.stack)
 
     @property
     def stuck(self):
@@ -44,7 +104,7 @@ class PDAConfiguration:
         return self.state == PDAConfiguration.STUCK_STATE
 
 
-@dataclass
+@dataclass(slots=True)
 class PDARule:
     state: State
     character: Optional[str]
@@ -69,14 +129,28 @@ class PDARule:
         return PDAConfiguration(self.next_state, self.next_stack(configuration))
 
 
+def _rule_key(rule):
+    return rule.state, rule.pop_character, rule.character
+
+
+def _configuration_key(configuration, character):
+    stack = configuration.stack
+    top = stack.top if stack.depth else None
+    return configuration.state, top, character
+
+
 @dataclass
 class DPDARulebook:
     rules: list[PDARule]
 
+    @cached_property
+    def index(self):
+        # built on first lookup, rules should not be mutated afterwards
+        return group_by(self.rules, _rule_key)
+
     def rule_for(self, configuration, character):
-        return detect(
-            self.rules, lambda rule: rule.applies_to(configuration, character)
-        )
+        rules = self.index.get(_configuration_key(configuration, character))
+        return rules[0] if rules else None
 
     def next_configuration(self, configuration, character):
         return self.rule_for(configuration, character).follow(configuration)
@@ -85,10 +159,36 @@ class DPDARulebook:
         return self.rule_for(configuration, character) is not None
 
     def follow_free_moves(self, configuration):
-        if self.applies_to(configuration, None):
-            return self.follow_free_moves(self.next_configuration(configuration, None))
-        else:
-            return configuration
+        guard = _LoopGuard()
+        rule = self.rule_for(configuration, None)
+        while rule is not None:
+            guard.visit(
+                _configuration_key(configuration, None), len(configuration.stack)
+            )
+            configuration = rule.follow(configuration)
+            rule = self.rule_for(configuration, None)
+        return configuration
+
+
+class _LoopGuard:
+    """
+    Spots a chain of free moves that never ends: once a (state, top) pair
+    comes back without the stack having dropped below where it was first
+    seen, the moves in between repeat forever
+    """
+
+    def __init__(self):
+        self.depths: dict[Hashable, int] = {}
+        self.marks: list[tuple[int, Hashable]] = []
+
+    def visit(self, key: Hashable, depth: int):
+        # pairs seen deeper than this have had their tops popped
+        while self.marks and self.marks[-1][0] > depth:
+            del self.depths[self.marks.pop()[1]]
+        if key in self.depths:
+            raise FreeMoveLoop(f"free moves loop from {key!r}")
+        self.depths[key] = depth
+        self.marks.append((depth, key))
 
 
 @dataclass
@@ -96,6 +196,10 @@ class DPDA:
     _current_configuration: PDAConfiguration
     accept_states: list[State]
     rulebook: DPDARulebook
+    # the configuration after free moves, settled once per character
+    _settled: Optional[PDAConfiguration] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def accepting(self):
@@ -103,21 +207,32 @@ class DPDA:
 
     def read_character(self, character):
         self._current_configuration = self.next_configuration(character)
+        self._settled = None
         return self
 
     def read_string(self, string):
         for c in string:
-            if not self.is_stuck:
-                self.read_character(c)
+            if self.is_stuck:
+                break
+            self.read_character(c)
         return self
 
+    def feed(self, chunk: Input) -> DPDA:
+        # input may arrive in pieces, the configuration carries over; once
+        # stuck, later chunks are not even decoded
+        if self.is_stuck:
+            return self
+        return self.read_string(as_text(chunk))
+
+    def finish(self) -> bool:
+        return self.accepting
+
     def next_configuration(self, character):
-        if self.rulebook.applies_to(self.current_configuration, character):
-            return self.rulebook.next_configuration(
-                self.current_configuration, character
-            )
-        else:
-            return self.current_configuration.stuck
+        configuration = self.current_configuration
+        rule = self.rulebook.rule_for(configuration, character)
+        if rule is None:
+            return configuration.stuck
+        return rule.follow(configuration)
 
     @property
     def is_stuck(self):
@@ -125,7 +240,82 @@ class DPDA:
 
     @property
     def current_configuration(self):
-        return self.rulebook.follow_free_moves(self._current_configuration)
+        if self._settled is None:
+            self._settled = self.rulebook.follow_free_moves(self._current_configuration)
+        return self._settled
+
+
+# a compiled DPDA reports getting stuck as this state
+STUCK = -1
+
+
+# (state, top, character) -> next state and the characters to push
+Moves = dict[tuple[int, Optional[str], Optional[str]], tuple[int, tuple[str, ...]]]
+
+
+@dataclass(frozen=True)
+class CompiledDPDA:
+    """
+    A DPDA over int states and a list stack with its top at the end,
+    driven by a dict keyed on (state, top, character)
+    """
+
+    start: int
+    bottom_character: str
+    accept: frozenset[int]
+    # next state and the characters to push, bottom first
+    moves: Moves
+    # (state, top) pairs with a free move
+    free: frozenset[tuple[int, Optional[str]]]
+
+    @classmethod
+    def from_design(cls, design: DPDADesign) -> CompiledDPDA:
+        numbers = {design.start_state: 0}
+        moves: Moves = {}
+        for rule in design.rulebook.rules:
+            state = numbers.setdefault(rule.state, len(numbers))
+            next_state = numbers.setdefault(rule.next_state, len(numbers))
+            push = tuple(rule.push_characters)[::-1]
+            # the first rule for a key wins, as in DPDARulebook
+            moves.setdefault(
+                (state, rule.pop_character, rule.character), (next_state, push)
+            )
+        return cls(
+            start=0,
+            bottom_character=design.bottom_character,
+            accept=frozenset(numbers[s] for s in design.accept_states if s in numbers),
+            moves=moves,
+            free=frozenset(key[:2] for key in moves if key[2] is None),
+        )
+
+    def follow_free_moves(self, state: int, stack: list[str]) -> int:
+        guard = _LoopGuard()
+        top = stack[-1] if stack else None
+        while (state, top) in self.free:
+            guard.visit((state, top), len(stack))
+            state, push = self.moves[state, top, None]
+            del stack[-1:]
+            stack.extend(push)
+            top = stack[-1] if stack else None
+        return state
+
+    def run(self, state: int, stack: list[str], string: Input) -> int:
+        # stack is updated in place, STUCK once no rule applies
+        moves, free = self.moves, self.free
+        state = self.follow_free_moves(state, stack)
+        for c in as_text(string):
+            move = moves.get((state, stack[-1] if stack else None, c))
+            if move is None:
+                return STUCK
+            state, push = move
+            del stack[-1:]
+            stack.extend(push)
+            if (state, stack[-1] if stack else None) in free:
+                state = self.follow_free_moves(state, stack)
+        return state
+
+    def accepts(self, string: Input) -> bool:
+        return self.run(self.start, [self.bottom_character], string) in self.accept
 
 
 @dataclass
@@ -144,15 +334,24 @@ class DPDADesign:
     def accepts(self, string):
         return self.to_dpda.read_string(string).accepting
 
+    def compile(self) -> CompiledDPDA:
+        return CompiledDPDA.from_design(self)
+
 
 @dataclass
 class NPDARulebook:
     rules: list[PDARule]
+    # optional bounds, exceeding either raises LimitExceeded
+    max_depth: Optional[int] = None
+    max_configurations: Optional[int] = None
+
+    @cached_property
+    def index(self):
+        # built on first lookup, rules should not be mutated afterwards
+        return group_by(self.rules, _rule_key)
 
     def rule_for(self, configuration, character):
-        return [
-            rule for rule in self.rules if rule.applies_to(configuration, character)
-        ]
+        return list(self.index.get(_configuration_key(configuration, character), ()))
 
     def follow_rules_for(self, configuration, character):
         return [
@@ -160,27 +359,52 @@ class NPDARulebook:
             for rule in self.rule_for(configuration, character)
         ]
 
-    def next_configurations(self, configurations, character):
-        return set(
-            sum(
-                [self.follow_rules_for(config, character) for config in configurations],
-                [],
-            )
+    def admit(self, configurations, configuration, stacks) -> bool:
+        # adds configuration unless an equal one is there. Its stack is
+        # interned in stacks first, so stacks built on it share cells with
+        # equal ones and compare by identity below the top
+        configuration.stack = stacks.setdefault(
+            configuration.stack, configuration.stack
         )
+        if configuration in configurations:
+            return False
+        if self.max_depth is not None and len(configuration.stack) > self.max_depth:
+            raise LimitExceeded(f"stack deeper than {self.max_depth}")
+        if (
+            self.max_configurations is not None
+            and len(configurations) >= self.max_configurations
+        ):
+            raise LimitExceeded(f"more than {self.max_configurations} configurations")
+        configurations.add(configuration)
+        return True
+
+    def next_configurations(self, configurations, character):
+        next_configurations, stacks = set(), {}
+        for configuration in configurations:
+            for next_configuration in self.follow_rules_for(configuration, character):
+                self.admit(next_configurations, next_configuration, stacks)
+        return next_configurations
 
     def follow_free_moves(self, configurations):
-        more_configurations = self.next_configurations(configurations, None)
-        if more_configurations.issubset(configurations):
-            return configurations
-        else:
-            return self.follow_free_moves(more_configurations.union(configurations))
+        # a worklist, each configuration is expanded once
+        settled, stacks = set(), {}
+        pending = [c for c in configurations if self.admit(settled, c, stacks)]
+        while pending:
+            for next_configuration in self.follow_rules_for(pending.pop(), None):
+                if self.admit(settled, next_configuration, stacks):
+                    pending.append(next_configuration)
+        return settled
 
 
 @dataclass
 class NPDA:
-    _current_configurations: PDAConfiguration
+    _current_configurations: Iterable[PDAConfiguration]
     accept_states: Iterable[State]
     rulebook: NPDARulebook
+    # the configurations after free moves, settled once per character
+    _settled: Optional[set[PDAConfiguration]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def accepting(self):
@@ -195,16 +419,35 @@ class NPDA:
         self._current_configurations = self.rulebook.next_configurations(
             self.current_configurations, character
         )
+        self._settled = None
         return self
 
     def read_string(self, string):
         for c in string:
+            if self.is_stuck:
+                break
             self.read_character(c)
         return self
 
+    def feed(self, chunk: Input) -> NPDA:
+        if self.is_stuck:
+            return self
+        return self.read_string(as_text(chunk))
+
+    def finish(self) -> bool:
+        return self.accepting
+
+    @property
+    def is_stuck(self):
+        return not self.current_configurations
+
     @property
     def current_configurations(self):
-        return self.rulebook.follow_free_moves(self._current_configurations)
+        if self._settled is None:
+            self._settled = self.rulebook.follow_free_moves(
+                self._current_configurations
+            )
+        return self._settled
 
 
 @dataclass
@@ -226,3 +469,8 @@ class NPDADesign:
 
     def accepts(self, string):
         return self.to_npda.read_string(string).accepting
+
+    @property
+    def to_grammar(self) -> Grammar:
+        # recognizes the same language in polynomial time
+        return Grammar.from_npda(self)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Sequence
+
+from ..utils import group_by
+from .charclass import ANY, Alphabet, Label, merge_labels, representative
+from .farule import FARule, State
+from .minimize import SINK
+
+if TYPE_CHECKING:
+    from .dfa import DFADesign
+
+# one state per design, SINK once a design has no transition left
+Product = tuple[object, ...]
+# whether the product accepts, given which of the designs accept
+Accept = Callable[[tuple[bool, ...]], bool]
+
+
+def _follow(design: DFADesign, state, character: str):
+    if state is SINK:
+        return SINK
+    rule = design.rulebook.rule_for(state, character)
+    return SINK if rule is None else rule.follow
+
+
+def _reachable(
+    designs: Sequence[DFADesign], symbols: Sequence[Label]
+) -> dict[Product, list[tuple[Label, Product]]]:
+    start = tuple(design.start_state for design in designs)
+    edges: dict[Product, list[tuple[Label, Product]]] = {start: []}
+    pending = [start]
+    while pending:
+        state = pending.pop()
+        for symbol in symbols:
+            c = representative(symbol)
+            next_state = tuple(
+                _follow(design, s, c) for design, s in zip(designs, state)
+            )
+            edges[state].append((symbol, next_state))
+            if next_state not in edges:
+                edges[next_state] = []
+                pending.append(next_state)
+    return edges
+
+
+def _live(
+    edges: dict[Product, list[tuple[Label, Product]]], accepting: set[Product]
+) -> set[Product]:
+    # states some accepting state can be reached from
+    sources: dict[Product, list[Product]] = {}
+    for state, moves in edges.items():
+        for _, next_state in moves:
+            sources.setdefault(next_state, []).append(state)
+    live, pending = set(accepting), list(accepting)
+    while pending:
+        for state in sources.get(pending.pop(), ()):
+            if state not in live:
+                live.add(state)
+                pending.append(state)
+    return live
+
+
+def product_rules(
+    designs: Sequence[DFADesign], accept: Accept
+) -> tuple[State, list[State], list[FARule]]:
+    """
+    The product of several DFAs, built from the start state over the
+    characters no design tells apart, so only reachable tuples of states
+    are materialized. Tuples that cannot lead to acceptance are merged into
+    SINK, which loops on every character, so the rulebook stays complete
+    """
+    labels: list[Label] = [ANY]
+    for design in designs:
+        labels += design.rulebook.alphabet
+    edges = _reachable(designs, Alphabet.partition(labels).symbols)
+
+    accept_sets = [set(design.accept_states) for design in designs]
+    accepting = {
+        state
+        for state in edges
+        if accept(tuple(s in states for s, states in zip(state, accept_sets)))
+    }
+    live = _live(edges, accepting)
+
+    def merged(state: Product) -> State:
+        return state if state in live else SINK
+
+    rules = []
+    for state in [state for state in edges if state in live]:
+        targets = group_by(edges[state], lambda move: merged(move[1]))
+        for next_state, moves in targets.items():
+            label = merge_labels(symbol for symbol, _ in moves)
+            rules.append(FARule(state, label, next_state))
+    start = merged(tuple(design.start_state for design in designs))
+    if start is SINK or any(rule.next_state is SINK for rule in rules):
+        rules.append(FARule(SINK, ANY, SINK))
+    accept_states: list[State] = [state for state in edges if state in accepting]
+    return start, accept_states, rules
@@ -0,0 +1,127 @@
+"""
+Binary format for compiled DFAs, all integers little-endian:
+
+    header    magic "CDFA", version u16, reserved u16, start u32,
+              state count u32, width u32, interval count u32
+    lows      u32 * intervals, first code point of each interval
+    highs     u32 * intervals, last code point of each interval
+    columns   i32 * intervals, table column of each interval
+    table     i32 * states * width, row-major transitions
+    accept    ceil(states / 8) bytes, bit i set when state i accepts
+
+Every section starts 4-byte aligned, so load() can cast the memory map
+to integer views in place.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import Literal, Sequence
+
+from ..exceptions import InvalidFormat
+from .compiled import CompiledDFA
+
+MAGIC = b"CDFA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIII")
+# array codes of the lows, highs, columns and table sections
+CODES: tuple[Literal["I", "i"], ...] = ("I", "I", "i", "i")
+
+
+def dumps(matcher: CompiledDFA) -> bytes:
+    state_count = matcher.state_count
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        0,
+        matcher.start,
+        state_count,
+        matcher.width,
+        len(matcher.lows),
+    )
+    sections = [
+        array("I", matcher.lows),
+        array("I", matcher.highs),
+        array("i", matcher.columns),
+        array("i", matcher.table),
+    ]
+    if sys.byteorder == "big":
+        for section in sections:
+            section.byteswap()
+    accept = matcher.accept.to_bytes((state_count + 7) // 8, "little")
+    return header + b"".join(s.tobytes() for s in sections) + accept
+
+
+def dump(matcher: CompiledDFA, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(dumps(matcher))
+
+
+def _header(view: memoryview) -> tuple[int, int, int, int]:
+    if len(view) < HEADER.size:
+        raise InvalidFormat("truncated header")
+    magic, version, _, start, state_count, width, intervals = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise InvalidFormat(f"bad magic {magic!r}")
+    if version != VERSION:
+        raise InvalidFormat(f"unsupported version {version}")
+    if width == 0:
+        raise InvalidFormat("table width is 0")
+    if start >= state_count:
+        raise InvalidFormat(f"start state {start} out of range")
+    return start, state_count, width, intervals
+
+
+def _check_range(section, bound: int, name: str) -> None:
+    # checked once here so that runs can index without checks
+    if section and not (0 <= min(section) and max(section) < bound):
+        raise InvalidFormat(f"{name} out of range")
+
+
+def loads(buffer) -> CompiledDFA:
+    """
+    Reads a compiled DFA from any bytes-like object; the tables are views
+    into the buffer, not copies
+    """
+    view = memoryview(buffer).cast("B")
+    start, state_count, width, intervals = _header(view)
+
+    sizes = [intervals * 4] * 3 + [state_count * width * 4]
+    if len(view) != HEADER.size + sum(sizes) + (state_count + 7) // 8:
+        raise InvalidFormat("size does not match header")
+
+    sections: list[Sequence[int]] = []
+    offset = HEADER.size
+    for size, code in zip(sizes, CODES):
+        section = view[offset : offset + size].cast(code)
+        if sys.byteorder == "big":
+            swapped = array(code, section)
+            swapped.byteswap()
+            sections.append(swapped)
+        else:
+            sections.append(section)
+        offset += size
+    lows, highs, columns, table = sections
+    _check_range(table, state_count, "transition")
+    _check_range(columns, width, "column")
+
+    return CompiledDFA(
+        start=start,
+        accept=int.from_bytes(view[offset:], "little"),
+        width=width,
+        table=table,
+        lows=lows,
+        highs=highs,
+        columns=columns,
+    )
+
+
+def load(path: str) -> CompiledDFA:
+    # the views keep the mapping open, and processes loading the same
+    # file share its pages
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(mapped)
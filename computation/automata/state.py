@@ -1,7 +1,40 @@
-from dataclasses import dataclass
+import os
+import secrets
+from dataclasses import dataclass, field
+from itertools import count
 
+# an id is a random 32-bit per-process prefix above a 32-bit counter, so
+# states pickled in another process never equal the ones made here; 0 is
+# kept for PDAConfiguration.STUCK_STATE
+_prefix = 0
+_ids = count(1)
 
-@dataclass(eq=False, frozen=True)
+
+def _reseed():
+    global _prefix, _ids
+    _prefix, _ids = secrets.randbits(32) << 32, count(1)
+
+
+_reseed()
+if hasattr(os, "register_at_fork"):
+    # forked workers would otherwise hand out the parent's next ids
+    os.register_at_fork(after_in_child=_reseed)
+
+
+def _next_id() -> int:
+    return _prefix | next(_ids)
+
+
+@dataclass(eq=False, frozen=True, slots=True)
 class State:
-    # each state is unique
-    pass
+    # each state is unique, its id survives pickling
+    id: int = field(default_factory=_next_id)
+
+    # by hand, the generated methods build a tuple of the fields per call
+    def __eq__(self, other):
+        if not isinstance(other, State):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import mmap
+from dataclasses import dataclass, field
+from typing import Any
+
+from .compiled import Input
+
+# every matcher uses 0 for the state no input can leave
+DEAD_STATE = 0
+
+
+@dataclass
+class Stream:
+    """
+    Feeds input to a CompiledDFA, BitNFA or LazyDFA chunk by chunk,
+    carrying the automaton state across chunks
+    """
+
+    matcher: Any
+    state: int = field(init=False)
+
+    def __post_init__(self):
+        self.state = self.matcher.start
+
+    @property
+    def is_stuck(self) -> bool:
+        return self.state == DEAD_STATE
+
+    def feed(self, chunk: Input) -> Stream:
+        if not self.is_stuck:
+            self.state = self.matcher.run(self.state, chunk)
+        return self
+
+    def finish(self) -> bool:
+        return self.matcher.accepting(self.state)
+
+
+def scan_file(matcher: Any, path: str, chunk_size: int = 1 << 20) -> bool:
+    # chunks are memoryview slices of the mapping, nothing is copied
+    stream = Stream(matcher)
+    with open(path, "rb") as f:
+        if not f.seek(0, 2):
+            return stream.finish()  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in range(0, len(view), chunk_size):
+                    stream.feed(view[offset : offset + chunk_size])
+                    if stream.is_stuck:
+                        break
+    return stream.finish()
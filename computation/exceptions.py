@@ -1,2 +1,14 @@
 class Unreachable(ValueError):
     pass
+
+
+class InvalidFormat(ValueError):
+    pass
+
+
+class FreeMoveLoop(RuntimeError):
+    pass
+
+
+class LimitExceeded(RuntimeError):
+    pass
@@ -13,6 +13,8 @@ OP_MAP = {
 
 
 class Expression:
+    __slots__ = ()
+
     @property
     def reducible(self):
         raise NotImplementedError
@@ -38,12 +40,16 @@ class Expression:
 
 
 class Statement(Expression):
+    __slots__ = ()
+
     @property
     def reducible(self):
         return True
 
 
 class Atom(Expression):
+    __slots__ = ()
+
     value: Any
 
     def __str__(self):
@@ -62,6 +68,8 @@ class Atom(Expression):
 
 
 class BinaryExpression(Expression):
+    __slots__ = ()
+
     left: Expression
     right: Expression
 
@@ -3,17 +3,17 @@ from dataclasses import dataclass
 from .abstract import Atom, BinaryExpression, Expression
 
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class Number(Atom):
     value: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Boolean(Atom):
     value: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Expression):
     name: str
 
@@ -35,7 +35,7 @@ class Variable(Expression):
         return f"lambda e: e['{self.name}']"
 
 
-@dataclass
+@dataclass(slots=True)
 class Add(BinaryExpression):
     left: Expression
     right: Expression
@@ -49,7 +49,7 @@ class Add(BinaryExpression):
         return Number(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class Sub(BinaryExpression):
     left: Expression
     right: Expression
@@ -63,7 +63,7 @@ class Sub(BinaryExpression):
         return Number(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class Multiply(BinaryExpression):
     left: Expression
     right: Expression
@@ -77,7 +77,7 @@ class Multiply(BinaryExpression):
         return Number(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class LessThan(BinaryExpression):
     left: Expression
     right: Expression
@@ -91,7 +91,7 @@ class LessThan(BinaryExpression):
         return Boolean(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class EqualTo(BinaryExpression):
     left: Expression
     right: Expression
@@ -105,7 +105,7 @@ class EqualTo(BinaryExpression):
         return Boolean(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class And(BinaryExpression):
     left: Expression
     right: Expression
@@ -119,7 +119,7 @@ class And(BinaryExpression):
         return Boolean(value)
 
 
-@dataclass
+@dataclass(slots=True)
 class Or(BinaryExpression):
     left: Expression
     right: Expression
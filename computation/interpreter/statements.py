@@ -5,7 +5,7 @@ from .expressions import Boolean
 from .expressions.abstract import Expression, Statement
 
 
-@dataclass
+@dataclass(slots=True)
 class DoNothing(Statement):
     def __str__(self):
         return "do-nothing"
@@ -22,7 +22,7 @@ class DoNothing(Statement):
         return "lambda e: e"
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Statement):
     name: str
     expression: Expression
@@ -54,7 +54,7 @@ class Assign(Statement):
         return f'lambda e: e | {{"{self.name}": ({self.expression.to_python})(e)}}'
 
 
-@dataclass
+@dataclass(slots=True)
 class If(Statement):
     condition: Expression
     consequence: Expression
@@ -94,7 +94,7 @@ class If(Statement):
         return f"lambda e: ({self.consequence.to_python})(e) if ({self.condition.to_python})(e) else ({self.alternative.to_python})(e)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Sequence(Statement):
     first: Expression
     second: Expression
@@ -117,7 +117,7 @@ class Sequence(Statement):
         return f"lambda e: ({self.second.to_python})(({self.first.to_python})(e))"
 
 
-@dataclass
+@dataclass(slots=True)
 class While(Statement):
     condition: Expression
     body: Expression
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 from enum import Enum, auto
+from functools import cached_property
 
 from ..exceptions import Unreachable
-from ..utils import detect
+from ..utils import group_by
 from .tape import Tape, TMConfiguration
 
 
@@ -11,7 +12,7 @@ class Direction(Enum):
     RIGHT = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class TMRule:
     state: int
     character: str
@@ -42,11 +43,17 @@ class TMRule:
 class DTMRulebook:
     rules: list[TMRule]
 
+    @cached_property
+    def index(self) -> dict[tuple[int, str], list[TMRule]]:
+        # built on first lookup, rules should not be mutated afterwards
+        return group_by(self.rules, lambda rule: (rule.state, rule.character))
+
     def applies_to(self, configuration: TMConfiguration):
         return self.rule_for(configuration) is not None
 
     def rule_for(self, configuration: TMConfiguration):
-        return detect(self.rules, lambda rule: rule.applies_to(configuration))
+        rules = self.index.get((configuration.state, configuration.tape.middle))
+        return rules[0] if rules else None
 
     def next_configuration(self, configuration: TMConfiguration):
         return self.rule_for(configuration).follow(configuration)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Tape:
     left: list[str]
     middle: str
@@ -29,7 +29,7 @@ class Tape:
         return Tape(left, middle, right, self.blank)
 
 
-@dataclass
+@dataclass(slots=True)
 class TMConfiguration:
     state: int
     tape: Tape
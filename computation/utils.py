@@ -1,8 +1,17 @@
-from typing import Callable, Optional, TypeVar
+from typing import Callable, Hashable, Iterable, Optional, TypeVar
 
 T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
 
 
 def detect(arr: list[T], func: Callable[[T], bool]) -> Optional[T]:
     # generator comprehension
     return next((i for i in arr if func(i)), None)
+
+
+def group_by(arr: Iterable[T], func: Callable[[T], K]) -> dict[K, list[T]]:
+    # keeps the original order inside each group
+    groups: dict[K, list[T]] = {}
+    for i in arr:
+        groups.setdefault(func(i), []).append(i)
+    return groups
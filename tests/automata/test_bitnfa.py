@@ -0,0 +1,42 @@
+import itertools
+
+from computation.automata.nfa import FARule, NFADesign, NFARulebook
+from computation.automata.pattern import Choose, Concatenate, Literal, Repeat
+
+
+def test_bit_nfa():
+    rulebook = NFARulebook(
+        [
+            FARule(1, "a", 1),
+            FARule(1, "a", 2),
+            FARule(1, None, 2),
+            FARule(2, "b", 3),
+            FARule(3, "b", 1),
+            FARule(3, None, 2),
+        ]
+    )
+    nfa_design = NFADesign(1, [3], rulebook)
+    bit_nfa = nfa_design.to_bit_nfa
+    assert bit_nfa.size == 3
+    # states are numbered start first, then accept states: 1, 3, 2
+    assert bit_nfa.start == 0b101
+    assert bit_nfa.accept == 0b010
+    assert bit_nfa.step(bit_nfa.start, "b") == 0b110
+    assert bit_nfa.step(bit_nfa.start, "c") == 0
+    for length in range(6):
+        for chars in itertools.product("abc", repeat=length):
+            string = "".join(chars)
+            assert bit_nfa.accepts(string) == nfa_design.accepts(string)
+
+
+def test_bit_nfa_many_states():
+    # (a|b)*a(a|b)(a|b)... spans several 8-bit chunks
+    any_char = Choose(Literal("a"), Literal("b"))
+    pattern = Concatenate(Repeat(any_char), Literal("a"))
+    for _ in range(4):
+        pattern = Concatenate(pattern, any_char)
+    nfa_design = pattern.to_nfa_design
+    bit_nfa = nfa_design.to_bit_nfa
+    assert bit_nfa.size > 16
+    for string in ["abbbb", "babab", "aaaa", "bbbbbbabbbb", "ababbbabab"]:
+        assert bit_nfa.accepts(string) == nfa_design.accepts(string)
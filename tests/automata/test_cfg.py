@@ -0,0 +1,83 @@
+import itertools
+
+from computation.automata.cfg import Grammar, Production
+from computation.automata.pda import NPDADesign, NPDARulebook, PDARule
+
+# even length palindromes over a and b
+palindromes = NPDADesign(
+    1,
+    "$",
+    [3],
+    NPDARulebook(
+        [
+            PDARule(1, "a", 1, "$", ["a", "$"]),
+            PDARule(1, "a", 1, "a", ["a", "a"]),
+            PDARule(1, "a", 1, "b", ["a", "b"]),
+            PDARule(1, "b", 1, "$", ["b", "$"]),
+            PDARule(1, "b", 1, "a", ["b", "a"]),
+            PDARule(1, "b", 1, "b", ["b", "b"]),
+            PDARule(1, None, 2, "$", ["$"]),
+            PDARule(1, None, 2, "a", ["a"]),
+            PDARule(1, None, 2, "b", ["b"]),
+            PDARule(2, "a", 2, "a", []),
+            PDARule(2, "b", 2, "b", []),
+            PDARule(2, None, 3, "$", ["$"]),
+        ]
+    ),
+)
+
+
+def test_grammar_from_npda():
+    grammar = palindromes.to_grammar
+    for n in range(9):
+        for string in map("".join, itertools.product("ab", repeat=n)):
+            assert grammar.accepts(string) == palindromes.accepts(string)
+
+    # popping the bottom character and accepting on an empty stack
+    empty = NPDADesign(
+        1,
+        "$",
+        [2],
+        NPDARulebook([PDARule(1, "a", 2, "$", []), PDARule(2, "b", 2, None, [])]),
+    )
+    grammar = empty.to_grammar
+    for string in ["", "a", "ab", "abb", "ba"]:
+        assert grammar.accepts(string) == empty.accepts(string)
+
+
+def test_grammar():
+    # nullable nonterminals, S -> ( S ) S | ε
+    balanced = Grammar(
+        "S", [Production("S", ("(", "S", ")", "S")), Production("S", ())]
+    )
+    assert balanced.nullable == {"S"}
+    assert balanced.accepts("")
+    assert balanced.accepts(b"(()())()")
+    assert not balanced.accepts("(()")
+    assert not balanced.accepts("())(")
+
+    # highly ambiguous, S -> S S | a | ε, still polynomial
+    ambiguous = Grammar(
+        "S",
+        [
+            Production("S", ("S", "S")),
+            Production("S", ("a",)),
+            Production("S", ()),
+        ],
+    )
+    assert ambiguous.accepts("a" * 200)
+    assert not ambiguous.accepts("a" * 200 + "b")
+
+    # A -> B, B -> ε makes A nullable through a chain
+    chain = Grammar(
+        "S",
+        [
+            Production("S", ("A", "x", "A")),
+            Production("A", ("B",)),
+            Production("B", ()),
+            Production("B", ("y",)),
+        ],
+    )
+    assert chain.accepts("x")
+    assert chain.accepts("yxy")
+    assert not chain.accepts("yy")
@@ -0,0 +1,89 @@
+from computation.automata.charclass import Alphabet, CharClass, merge_labels
+from computation.automata.dfa import DFADesign
+from computation.automata.farule import DFARulebook, FARule
+from computation.automata.nfa import NFASimulation
+from computation.automata.pattern import (
+    CharacterClass,
+    Choose,
+    Concatenate,
+    Literal,
+    Repeat,
+)
+
+word = CharClass.of("a-z", "0-9", "_")
+
+
+def test_char_class():
+    assert word == CharClass(((48, 57), (95, 95), (97, 122)))
+    assert str(word) == "[0-9_a-z]"
+    assert CharClass.of("a-c", "b-f") == CharClass.of("a-f")
+    assert "q" in word
+    assert "_" in word
+    assert "A" not in word
+    assert "ab" not in word
+    assert FARule(1, word, 2).applies_to(1, "x")
+    assert not FARule(1, word, 2).applies_to(1, "-")
+    assert merge_labels([CharClass.of("a-y"), "z", "0"]) == CharClass.of("0", "a-z")
+    assert merge_labels(["x", "x"]) == "x"
+
+
+def test_alphabet_partition():
+    alphabet = Alphabet.partition([CharClass.of("a-z"), CharClass.of("0-9"), "e"])
+    assert alphabet.symbols == (
+        CharClass.of("0-9"),
+        CharClass.of("a-d", "f-z"),
+        "e",
+    )
+    assert alphabet.index("7") == 0
+    assert alphabet.index("z") == 1
+    assert alphabet.index("e") == 2
+    assert alphabet.index("A") is None
+
+    alphabet = Alphabet.partition(["b", "a", "b"])
+    assert alphabet.symbols == ("a", "b")
+
+
+def test_character_class_pattern():
+    # identifiers: [a-z_][0-9_a-z]*
+    pattern = Concatenate(
+        CharacterClass(CharClass.of("a-z", "_")), Repeat(CharacterClass(word))
+    )
+    assert str(pattern) == "[_a-z][0-9_a-z]*"
+    assert pattern.matches("snake_case_42")
+    assert not pattern.matches("42nd")
+    assert not pattern.matches("")
+    assert list(pattern.finditer("x1 = y_2 + 3")) == [(0, 2), (5, 8)]
+
+    dfa_design = NFASimulation(pattern.to_nfa_design).to_dfa_design
+    # one rule per equivalence class and state, not per character
+    assert len(dfa_design.rulebook.rules) == 8
+    assert dfa_design.accepts("snake_case_42")
+    assert not dfa_design.accepts("42nd")
+
+    compiled = dfa_design.minimize().compile()
+    assert compiled.width == 3
+    assert compiled.accepts("a1_b2")
+    assert compiled.accepts(b"a1_b2")
+    assert not compiled.accepts("1a")
+    assert not compiled.accepts("aé")
+
+
+def test_unicode_class():
+    greek = CharacterClass(CharClass.of("α-ω"))
+    pattern = Concatenate(Repeat(greek), Choose(Literal("!"), Literal("?")))
+    assert pattern.matches("λαμδα!")
+    assert not pattern.matches("lambda!")
+    compiled = NFASimulation(pattern.to_nfa_design).to_dfa_design.compile()
+    assert compiled.accepts("λαμδα?")
+    assert not compiled.accepts("λαμδα")
+
+
+def test_compiled_columns():
+    # characters that behave the same share one column
+    rulebook = DFARulebook(
+        [FARule(1, c, 2) for c in "abcdef"] + [FARule(2, c, 1) for c in "abcdef"]
+    )
+    compiled = DFADesign(1, [1], rulebook).compile()
+    assert compiled.width == 2
+    assert compiled.accepts("abcdef")
+    assert not compiled.accepts("abcde")
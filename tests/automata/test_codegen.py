@@ -0,0 +1,70 @@
+import itertools
+
+from computation.automata.charclass import CharClass
+from computation.automata.codegen import python_function, python_source
+from computation.automata.dfa import DFADesign, DFARulebook
+from computation.automata.farule import FARule
+from computation.automata.nfa import NFASimulation
+from computation.automata.pattern import Choose, Concatenate, Literal, Repeat
+
+rulebook = DFARulebook(
+    [
+        FARule(1, "a", 2),
+        FARule(1, "b", 1),
+        FARule(2, "a", 2),
+        FARule(2, "b", 3),
+        FARule(3, "a", 3),
+        FARule(3, "b", 3),
+    ]
+)
+dfa_design = DFADesign(1, [3], rulebook)
+
+
+def test_to_python():
+    source = dfa_design.to_python
+    assert "\ndef match(string):" in source
+    match = dfa_design.python_matcher
+    assert match is dfa_design.python_matcher
+    for n in range(6):
+        for string in map("".join, itertools.product("abc", repeat=n)):
+            assert match(string) == dfa_design.compiled.accepts(string)
+            assert match(string.encode()) == dfa_design.compiled.accepts(string)
+
+
+def test_to_python_tables():
+    # identifiers: a long class is compared, the short ranges go in a dict
+    word = CharClass.of("a-z", "A-Z", "0-9", "_", "Ā-￿")
+    design = DFADesign(
+        1,
+        [2],
+        DFARulebook(
+            [FARule(1, CharClass.of("a-z", "_", "Ā-￿"), 2), FARule(2, word, 2)]
+        ),
+    )
+    source = python_source(design.compile(), "identifier")
+    assert "def R2(c):" in source and "'_': 2" in source
+    identifier = python_function(source, "identifier")
+    for string in ["", "x", "_x1", "1x", "x-y", "é", "āĂ", "aZ9_"]:
+        assert identifier(string) == design.compiled.accepts(string)
+
+    nothing = python_function(python_source(DFADesign(1, [], rulebook).compile()))
+    assert not nothing("ab")
+
+
+def test_to_python_dispatch():
+    # (a|b)*a(a|b){6} has 129 states, the state is picked by indexing a
+    # list of dicts, so the loop does not grow with them
+    ab = Choose(Literal("a"), Literal("b"))
+    pattern = Concatenate(Repeat(ab), Literal("a"))
+    for _ in range(6):
+        pattern = Concatenate(pattern, ab)
+    design = NFASimulation(pattern.to_nfa_design, minimize=True).to_dfa_design
+    assert design.compiled.state_count == 129
+
+    def loop(source):
+        return source[source.index("def match") :].splitlines()[:-1]
+
+    assert loop(design.to_python) == loop(dfa_design.to_python)
+    for n in range(9):
+        for string in map("".join, itertools.product("ab", repeat=n)):
+            assert design.python_matcher(string) == design.compiled.accepts(string)
@@ -0,0 +1,75 @@
+import itertools
+
+from computation.automata import compiled as compiled_module
+from computation.automata.dfa import DFADesign, DFARulebook
+from computation.automata.farule import FARule
+
+rulebook = DFARulebook(
+    [
+        FARule(1, "a", 2),
+        FARule(1, "b", 1),
+        FARule(2, "a", 2),
+        FARule(2, "b", 3),
+        FARule(3, "a", 3),
+        FARule(3, "b", 3),
+    ]
+)
+dfa_design = DFADesign(1, [3], rulebook)
+
+
+def test_compiled_dfa():
+    compiled = dfa_design.compile()
+    assert compiled.state_count == 4
+    assert compiled.width == 3
+    for string in ["", "a", "baa", "baba", "ab", "bbbbab", "aaaa"]:
+        assert compiled.accepts(string) == dfa_design.accepts(string)
+        assert compiled.accepts(string.encode()) == dfa_design.accepts(string)
+
+    # characters outside the alphabet lead to the dead state
+    assert not compiled.accepts("abc")
+    assert not compiled.accepts(b"ab\xff")
+    assert not compiled.accepts(memoryview(b"abc"))
+
+
+def test_compiled_dfa_partial():
+    compiled = DFADesign(1, [2], DFARulebook([FARule(1, "a", 2)])).compile()
+    assert compiled.accepts("a")
+    assert not compiled.accepts("aa")
+    assert not compiled.accepts("")
+    assert compiled.run(compiled.start, "aa") == 0
+
+
+def test_accepts_many():
+    strings = [
+        "a",
+        "baa",
+        "baba",
+        "baba",
+        "",
+        b"ab",
+        memoryview(b"bb"),
+        bytearray(b"ab"),
+    ]
+    assert dfa_design.accepts_many(strings) == [
+        False,
+        False,
+        True,
+        True,
+        False,
+        True,
+        False,
+        True,
+    ]
+    assert dfa_design.accepts_many([]) == []
+    assert dfa_design.compiled is dfa_design.compiled
+
+
+def test_accepts_many_batch(monkeypatch):
+    # enough strings to step together, with long and non-latin-1 ones
+    compiled = dfa_design.compile()
+    strings = ["".join(p) for n in range(6) for p in itertools.product("abé", repeat=n)]
+    strings += ["ab" * 500, "b" * 300 + "a", "\ud800ab", b"\xffab", bytearray(b"ba")]
+    expected = [compiled.accepts(string) for string in strings]
+    assert compiled.accepts_many(strings) == expected
+    monkeypatch.setattr(compiled_module, "numpy", None)
+    assert compiled.accepts_many(strings) == expected
@@ -1,3 +1,5 @@
+import itertools
+
 from computation.automata.dfa import DFA, DFADesign, DFARulebook
 from computation.automata.farule import FARule
 
@@ -54,3 +56,85 @@ def test_dfa_design():
     assert not (dfa_design.accepts("a"))
     assert not (dfa_design.accepts("baa"))
     assert dfa_design.accepts("baba")
+
+
+def test_dfa_rulebook_index():
+    rulebook = DFARulebook([FARule(1, "a", 2), FARule(1, "a", 3), FARule(2, "a", 1)])
+    assert rulebook.rule_for(1, "a") == FARule(1, "a", 2)
+    assert rulebook.rule_for(3, "a") is None
+    assert rulebook.index[(1, "a")] == [FARule(1, "a", 2), FARule(1, "a", 3)]
+    assert not hasattr(rulebook.rules[0], "__dict__")
+
+
+def test_dfa_minimize():
+    # states 2 and 3 both accept everything from here on
+    rulebook = DFARulebook(
+        [
+            FARule(1, "a", 2),
+            FARule(1, "b", 3),
+            FARule(2, "a", 2),
+            FARule(2, "b", 3),
+            FARule(3, "a", 2),
+            FARule(3, "b", 3),
+            FARule(4, "a", 1),
+        ]
+    )
+    dfa_design = DFADesign(1, [2, 3], rulebook)
+    minimal = dfa_design.minimize()
+    assert minimal.start_state == 0
+    assert minimal.accept_states == [1]
+    assert len(minimal.rulebook.rules) == 4
+    for string in ["", "a", "b", "ab", "bbba"]:
+        assert minimal.accepts(string) == dfa_design.accepts(string)
+
+    # missing transitions stay missing
+    partial = DFADesign(1, [3], DFARulebook([FARule(1, "a", 2), FARule(2, "b", 3)]))
+    minimal = partial.minimize()
+    assert len(minimal.rulebook.rules) == 2
+    assert minimal.accepts("ab")
+    assert not minimal.accepts("a")
+
+
+def test_dfa_product():
+    even_a = DFADesign(
+        0,
+        [0],
+        DFARulebook(
+            [FARule(0, "a", 1), FARule(0, "b", 0), FARule(1, "a", 0), FARule(1, "b", 1)]
+        ),
+    )
+    # partial, only strings starting with "b"
+    starts_b = DFADesign(
+        0,
+        [1],
+        DFARulebook([FARule(0, "b", 1), FARule(1, "a", 1), FARule(1, "b", 1)]),
+    )
+    designs = {
+        "&": (even_a & starts_b, lambda x, y: x and y),
+        "|": (even_a | starts_b, lambda x, y: x or y),
+        "-": (even_a - starts_b, lambda x, y: x and not y),
+        "~": (~even_a, lambda x, y: not x),
+    }
+    for n in range(6):
+        for string in map("".join, itertools.product("abc", repeat=n)):
+            expected = (
+                even_a.compiled.accepts(string),
+                starts_b.compiled.accepts(string),
+            )
+            for design, accept in designs.values():
+                minimal = design.minimize()
+                assert design.accepts(string) == accept(*expected)
+                assert design.compiled.accepts(string) == accept(*expected)
+                assert minimal.compile().accepts(string) == accept(*expected)
+
+    # only reachable pairs are built, and dead ones share one sink
+    assert len({rule.state for rule in (even_a & starts_b).rulebook.rules}) == 4
+    assert (~even_a).accepts("ä")
+    assert not (even_a - even_a).compiled.accepts("aa")
+
+    # empty products still read every character
+    odd_a = DFADesign(1, [0], even_a.rulebook)
+    for string in ["", "a", "ab", "ä"]:
+        assert not (even_a & odd_a).accepts(string)
+        assert not (even_a - even_a).accepts(string)
+    assert DFADesign.product([even_a, starts_b, ~starts_b], any).accepts("ab")
@@ -0,0 +1,37 @@
+from computation.automata.pattern import Choose, Concatenate, Literal, Repeat
+
+
+def test_lazy_dfa():
+    pattern = Repeat(Choose(Concatenate(Literal("a"), Literal("b")), Literal("a")))
+    lazy_dfa = pattern.to_lazy_dfa()
+    for string in ["", "a", "ab", "aba", "abb", "abaab", "b"]:
+        assert lazy_dfa.accepts(string) == pattern.matches(string)
+
+    lazy_dfa = pattern.to_lazy_dfa()
+    assert lazy_dfa.accepts("abab")
+    assert lazy_dfa.stats == {
+        "states": 3,
+        "hits": 1,
+        "misses": 3,
+        "evictions": 0,
+        "fallbacks": 0,
+    }
+
+
+def test_lazy_dfa_eviction():
+    # (a|b)*a(a|b)(a|b)(a|b) needs 16 DFA states
+    any_char = Choose(Literal("a"), Literal("b"))
+    pattern = Concatenate(Repeat(any_char), Literal("a"))
+    for _ in range(3):
+        pattern = Concatenate(pattern, any_char)
+    string = "abbabaaabbbabbaa" * 4
+
+    lazy_dfa = pattern.to_lazy_dfa(max_states=4)
+    lazy_dfa.max_flushes = 100
+    assert lazy_dfa.accepts(string) == pattern.matches(string)
+    assert lazy_dfa.evictions > 0
+    assert lazy_dfa.fallbacks == 0
+
+    lazy_dfa = pattern.to_lazy_dfa(max_states=4)
+    assert lazy_dfa.accepts(string) == pattern.matches(string)
+    assert lazy_dfa.fallbacks == 1
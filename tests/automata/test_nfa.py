@@ -115,3 +115,56 @@ def test_free_move():
     assert nfa_design.accepts("aa")
     assert not (nfa_design.accepts("aaaaa"))
     assert not (nfa_design.accepts("a"))
+
+
+def test_nfa_simulation_minimize():
+    rulebook = NFARulebook(
+        [
+            FARule(1, "a", 1),
+            FARule(1, "b", 1),
+            FARule(1, "b", 2),
+            FARule(2, "a", 3),
+            FARule(2, "b", 3),
+        ]
+    )
+    nfa_design = NFADesign(1, [3], rulebook)
+    dfa_design = NFASimulation(nfa_design).to_dfa_design
+    minimal = NFASimulation(nfa_design, minimize=True).to_dfa_design
+    assert len(minimal.rulebook.rules) <= len(dfa_design.rulebook.rules)
+    assert minimal.start_state == 0
+    for string in ["", "b", "ba", "bb", "abab", "abba", "bbbbb", "aaaa"]:
+        assert minimal.accepts(string) == nfa_design.accepts(string)
+
+
+def test_nfa_simulation_long_chain():
+    rulebook = NFARulebook([FARule(i, "a", i + 1) for i in range(3000)])
+    progress = []
+    simulation = NFASimulation(
+        NFADesign(0, [3000], rulebook),
+        progress=lambda states, rules: progress.append((states, rules)),
+    )
+    dfa_design = simulation.to_dfa_design
+    assert dfa_design.accepts("a" * 3000)
+    assert not (dfa_design.accepts("a" * 2999))
+    # one subset per chain position plus the empty subset
+    assert progress[-1] == (3002, 3002)
+
+
+def test_free_move_closures():
+    rulebook = NFARulebook(
+        [
+            FARule(1, None, 2),
+            FARule(2, None, 3),
+            FARule(3, None, 1),
+            FARule(3, None, 4),
+            FARule(4, "a", 1),
+        ]
+    )
+    closures = rulebook.free_move_closures
+    assert closures[1] == closures[2] == closures[3] == set([1, 2, 3, 4])
+    assert closures[4] == set([4])
+    assert rulebook.follow_free_moves([4, 5]) == set([4, 5])
+
+    # long free move chains do not recurse
+    rulebook = NFARulebook([FARule(i, None, i + 1) for i in range(2000)])
+    assert rulebook.follow_free_moves([0]) == set(range(2001))
@@ -0,0 +1,138 @@
+import mmap
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from computation.automata.dfa import DFADesign, DFARulebook
+from computation.automata.farule import FARule
+from computation.automata.nfa import NFADesign, NFARulebook, NFASimulation
+from computation.automata.parallel import (
+    accepts_many_parallel,
+    accepts_parallel,
+    run_parallel,
+    state_map,
+)
+from computation.automata.pattern import Choose, Concatenate, Literal, Repeat
+from computation.automata.state import State
+
+# strings over a and b with an even number of a and containing "bb"
+rulebook = DFARulebook(
+    [
+        FARule((even, seen, last_b), "a", (not even, seen, False))
+        for even in (True, False)
+        for seen in (True, False)
+        for last_b in (True, False)
+    ]
+    + [
+        FARule((even, seen, last_b), "b", (even, seen or last_b, True))
+        for even in (True, False)
+        for seen in (True, False)
+        for last_b in (True, False)
+    ]
+)
+dfa_design = DFADesign(
+    (True, False, False), [(True, True, False), (True, True, True)], rulebook
+)
+
+
+def test_state_map():
+    compiled = dfa_design.compile()
+    mapping = state_map(compiled, "abba")
+    assert len(mapping) == compiled.state_count
+    assert mapping[0] == 0
+    assert mapping[compiled.start] == compiled.run(compiled.start, "abba")
+    for state in range(compiled.state_count):
+        assert mapping[state] == compiled.run(state, "abba")
+
+
+def test_run_parallel():
+    compiled = pickle.loads(pickle.dumps(dfa_design.compile()))
+    strings = ["ab" * 5000 + "bb" + "a" * 3, "ab" * 5000 + "bb" + "aa", "ab" * 9999]
+    with ProcessPoolExecutor(2) as executor:
+        for string in strings:
+            expected = compiled.run(compiled.start, string)
+            assert run_parallel(compiled, string, executor=executor) == expected
+            assert run_parallel(compiled, string.encode(), 2, executor) == expected
+            assert accepts_parallel(
+                compiled, string, executor=executor
+            ) == dfa_design.accepts(string)
+        assert run_parallel(compiled, "", executor=executor) == compiled.start
+        assert run_parallel(compiled, b"", executor=executor) == compiled.start
+
+    # short inputs are run in this process
+    assert accepts_parallel(compiled, "abab" + "bb" + "aa", max_workers=4)
+
+
+def test_run_parallel_mmap(tmp_path):
+    compiled = dfa_design.compile()
+    data = ("ab" * 50000 + "bb" + "a" * 2).encode()
+    path = tmp_path / "input"
+    path.write_bytes(data)
+    expected = compiled.run(compiled.start, data)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        view = memoryview(m)
+        assert run_parallel(compiled, view, 2) == expected
+        assert accepts_parallel(compiled, view, 2)
+        with ProcessPoolExecutor(2) as executor:
+            assert run_parallel(compiled, view, executor=executor) == expected
+        view.release()
+
+
+def test_state_pickle():
+    state = State()
+    copy = pickle.loads(pickle.dumps(state))
+    assert copy == state
+    assert hash(copy) == hash(state)
+    assert State() != state
+
+
+def xy_design():
+    return Concatenate(Literal("x"), Literal("y")).to_nfa_design
+
+
+def test_state_pickle_processes():
+    # states made in a worker never equal states made here, even ones
+    # made after the worker started, before the design is loaded
+    with ProcessPoolExecutor(1) as pool:
+        pool.submit(int).result()
+        local = Concatenate(Literal("a"), Literal("b")).to_nfa_design
+        loaded = pool.submit(xy_design).result()
+
+    start = State()
+    union = NFADesign(
+        start,
+        loaded.accept_states + local.accept_states,
+        NFARulebook(
+            loaded.rulebook.rules
+            + local.rulebook.rules
+            + [FARule(start, None, d.start_state) for d in (loaded, local)]
+        ),
+    )
+    for string in ["xy", "ab"]:
+        assert union.accepts(string)
+    for string in ["ay", "xb", "x", "a", ""]:
+        assert not union.accepts(string)
+
+
+def test_accepts_many_parallel():
+    # a design whose states are sets of pattern states
+    pattern = Repeat(Choose(Literal("a"), Concatenate(Literal("b"), Literal("b"))))
+    design = NFASimulation(pattern.to_nfa_design).to_dfa_design
+    strings = ["", "a", "b", "abba", "abbb", "bba" * 1000]
+    expected = [pattern.matches(string) for string in strings]
+    assert accepts_many_parallel(design, strings, max_workers=2) == expected
+    assert dfa_design.accepts_many(["abba", "aa", b"bb"], max_workers=2) == [
+        True,
+        False,
+        True,
+    ]
+
+    # a long-lived pool is reused across calls
+    many = strings * 200
+    with ProcessPoolExecutor(2) as executor:
+        for _ in range(2):
+            assert accepts_many_parallel(design, many, executor=executor) == (
+                expected * 200
+            )
+        assert dfa_design.accepts_many(
+            [memoryview(b"abba"), "aa"], executor=executor
+        ) == [True, False]
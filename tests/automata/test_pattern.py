@@ -1,4 +1,17 @@
-from computation.automata.pattern import Choose, Concatenate, Empty, Literal, Repeat
+import random
+from functools import reduce
+
+import pytest
+
+from computation.automata.bitnfa import BitNFA
+from computation.automata.pattern import (
+    Choose,
+    Concatenate,
+    Empty,
+    Literal,
+    PatternSet,
+    Repeat,
+)
 
 
 def test_pattern():
@@ -53,3 +66,118 @@ def test_nfa_design():
     assert pattern.matches("aa")
     assert pattern.matches("aaaaaaaaaa")
     assert not (pattern.matches("b"))
+
+
+def test_compile():
+    pattern = Repeat(Choose(Concatenate(Literal("a"), Literal("b")), Literal("a")))
+    same = Repeat(Choose(Concatenate(Literal("a"), Literal("b")), Literal("a")))
+    assert pattern == same
+    assert hash(pattern) == hash(same)
+    assert pattern != Repeat(Choose(Literal("a"), Literal("b")))
+    assert Literal("|") != Choose(Empty(), Empty())
+    assert Literal("a") != Literal("b")
+
+    matcher = pattern.compile()
+    assert same.compile() is matcher
+    read = matcher.hits + matcher.misses
+    assert matcher.accepts("aba")
+    assert pattern.matches("abaab")
+    assert matcher.hits + matcher.misses == read + 8
+
+
+def test_search():
+    pattern = Concatenate(Literal("a"), Repeat(Literal("b")))
+    assert pattern.search("xxabbbxab") == (2, 6)
+    assert pattern.search("xxabbbxab", 6) == (7, 9)
+    assert pattern.search("xyz") is None
+    assert list(pattern.finditer("abbaab")) == [(0, 3), (3, 4), (4, 6)]
+    assert pattern.count("ab" * 100) == 100
+    # bytes are read as latin-1, so mapped files can be searched
+    assert pattern.search(b"xxabbbxab") == (2, 6)
+    assert list(pattern.finditer(memoryview(b"abbaab"), 1)) == [(3, 4), (4, 6)]
+
+    # leftmost wins over an earlier finished match
+    pattern = Choose(
+        Concatenate(Literal("a"), Concatenate(Literal("b"), Literal("c"))),
+        Literal("b"),
+    )
+    assert list(pattern.finditer("abcb")) == [(0, 3), (3, 4)]
+
+    # empty matches, like re.finditer
+    pattern = Repeat(Literal("a"))
+    assert list(pattern.finditer("baa")) == [(0, 0), (1, 3), (3, 3)]
+
+    # threads that read past a match end are not rescanned, this is linear
+    pattern = Choose(Concatenate(Repeat(Literal("a")), Literal("b")), Literal("a"))
+    assert pattern.count("a" * 20000) == 20000
+    assert list(pattern.finditer("aaba")) == [(0, 3), (3, 4)]
+
+
+def test_pattern_set():
+    patterns = PatternSet(
+        [
+            Concatenate(Literal("a"), Repeat(Literal("b"))),
+            Repeat(Literal("b")),
+            Choose(Literal("a"), Literal("c")),
+        ]
+    )
+    assert len(patterns) == 3
+    assert patterns.matches("abb") == [0]
+    assert patterns.matches("a") == [0, 2]
+    assert patterns.matches("") == [1]
+    assert patterns.matches("ba") == []
+
+    assert list(patterns.finditer("cabbxbb")) == [
+        (0, 1, [2]),
+        (1, 4, [0]),
+        (4, 4, [1]),
+        (5, 7, [1]),
+        (7, 7, [1]),
+    ]
+
+
+def test_pattern_set_scaling(monkeypatch):
+    def word(length):
+        letters = [Literal(random.choice("abcd")) for _ in range(length)]
+        return reduce(Concatenate, letters)
+
+    random.seed(0)
+    patterns = PatternSet(Concatenate(word(3), Repeat(word(1))) for _ in range(300))
+    text = "".join(random.choice("abcd ") for _ in range(2000))
+    found = list(patterns.finditer(text))
+    assert found
+
+    # once warm, search only follows cached rows, so its cost per character
+    # does not depend on the number of patterns
+    def fail(*args):
+        pytest.fail("the automaton was stepped")
+
+    monkeypatch.setattr(BitNFA, "step", fail)
+    monkeypatch.setattr(BitNFA, "reverse_step", fail)
+    monkeypatch.setattr(patterns, "tags", [])
+    assert list(patterns.finditer(text)) == found
+
+
+def test_optimized():
+    a, b, c = Literal("a"), Literal("b"), Literal("c")
+    assert Concatenate(Empty(), a).optimized == a
+    assert Concatenate(Concatenate(a, b), c).optimized == Concatenate(
+        a, Concatenate(b, c)
+    )
+    assert Repeat(Repeat(a)).optimized == Repeat(a)
+    assert Repeat(Choose(Empty(), a)).optimized == Repeat(a)
+    assert Repeat(Choose(Repeat(a), b)).optimized == Repeat(Choose(a, b))
+    assert Repeat(Empty()).optimized == Empty()
+    assert Choose(a, a).optimized == a
+    assert Choose(Empty(), Repeat(a)).optimized == Repeat(a)
+    assert Choose(Choose(a, b), Choose(b, a)).optimized == Choose(a, b)
+
+    # ab|ac|a -> a(b|c|)
+    pattern = Choose(Concatenate(a, b), Choose(Concatenate(a, c), a))
+    optimized = pattern.optimized
+    assert str(optimized) == "a(b|c|)"
+    assert len(optimized.to_nfa_design.rulebook.rules) < len(
+        pattern.to_nfa_design.rulebook.rules
+    )
+    for string in ["a", "ab", "ac", "abc", "b", ""]:
+        assert optimized.matches(string) == pattern.to_nfa_design.accepts(string)
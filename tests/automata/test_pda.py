@@ -1,3 +1,6 @@
+import itertools
+import pickle
+
 import pytest
 
 from computation.automata.pda import (
@@ -11,6 +14,7 @@ from computation.automata.pda import (
     PDARule,
     Stack,
 )
+from computation.exceptions import FreeMoveLoop, LimitExceeded
 
 # check parentheses
 rulebook = DPDARulebook(
@@ -27,6 +31,29 @@ def test_pda_rule():
     rule = PDARule(1, "(", 2, "$", ["b", "$"])
     configuration = PDAConfiguration(1, Stack(["$"]))
     assert rule.applies_to(configuration, "(")
+    assert not hasattr(rule, "__dict__")
+    assert not hasattr(configuration, "__dict__")
+
+
+def test_stack():
+    stack = Stack(["$", "a"])
+    pushed = stack.push("b")
+    assert pushed.contents == ["$", "a", "b"]
+    assert pushed.top == "b"
+    assert pushed.pop is stack
+    assert len(pushed) == 3
+    assert pushed == Stack(["$", "a", "b"])
+    assert hash(pushed) == hash(Stack(["$", "a", "b"]))
+    assert pushed != Stack(["$", "b", "a"])
+    assert Stack([]).pop == Stack([])
+    with pytest.raises(IndexError):
+        Stack([]).top
+
+    deep = Stack(["$"])
+    for _ in range(100000):
+        deep = deep.push("b")
+    assert len(deep) == 100001
+    assert pickle.loads(pickle.dumps(deep)) == deep
 
 
 def test_pda_config():
@@ -72,6 +99,49 @@ def test_dpda_design():
     assert not (dpda_design.accepts("())"))
 
 
+def test_dpda_free_moves():
+    dpda = DPDA(PDAConfiguration(1, Stack(["$"])), [1], rulebook)
+    dpda.read_string("()")
+    assert dpda.current_configuration is dpda.current_configuration
+
+    # the free moves pop every b, far deeper than the recursion limit
+    counter = DPDADesign(
+        1,
+        "$",
+        [3],
+        DPDARulebook(
+            [
+                PDARule(1, "a", 1, "$", ["b", "$"]),
+                PDARule(1, "a", 1, "b", ["b", "b"]),
+                PDARule(1, "c", 2, "b", ["b"]),
+                PDARule(2, None, 2, "b", []),
+                PDARule(2, None, 3, "$", ["$"]),
+            ]
+        ),
+    )
+    assert counter.accepts("a" * 5000 + "c")
+    assert counter.compile().accepts("a" * 5000 + "c")
+
+    # pushing forever never repeats a configuration
+    growing = DPDADesign(
+        1, "$", [1], DPDARulebook([PDARule(1, None, 1, "$", ["$", "$"])])
+    )
+    with pytest.raises(FreeMoveLoop):
+        growing.accepts("")
+    with pytest.raises(FreeMoveLoop):
+        growing.compile().accepts("")
+
+
+def test_compiled_dpda():
+    dpda_design = DPDADesign(1, "$", [1], rulebook)
+    compiled = dpda_design.compile()
+    for n in range(9):
+        for string in map("".join, itertools.product("()", repeat=n)):
+            assert compiled.accepts(string) == dpda_design.accepts(string)
+    assert compiled.accepts(b"(()())")
+    assert not compiled.accepts("(x)")
+
+
 def test_npda_design():
     rulebook = NPDARulebook(
         [
@@ -104,3 +174,70 @@ def test_npda_design():
     assert npda_design.accepts("abba")
     assert npda_design.accepts("babbaabbab")
     assert not (npda_design.accepts("abb"))
+
+
+# even length palindromes over a and b
+palindromes = [
+    PDARule(1, "a", 1, "$", ["a", "$"]),
+    PDARule(1, "a", 1, "a", ["a", "a"]),
+    PDARule(1, "a", 1, "b", ["a", "b"]),
+    PDARule(1, "b", 1, "$", ["b", "$"]),
+    PDARule(1, "b", 1, "a", ["b", "a"]),
+    PDARule(1, "b", 1, "b", ["b", "b"]),
+    PDARule(1, None, 2, "$", ["$"]),
+    PDARule(1, None, 2, "a", ["a"]),
+    PDARule(1, None, 2, "b", ["b"]),
+    PDARule(2, "a", 2, "a", []),
+    PDARule(2, "b", 2, "b", []),
+    PDARule(2, None, 3, "$", ["$"]),
+]
+
+
+def test_npda_limits():
+    npda_design = NPDADesign(1, "$", [3], NPDARulebook(palindromes, max_depth=9))
+    assert npda_design.accepts("abbaabba")
+    with pytest.raises(LimitExceeded):
+        npda_design.accepts("abbaabbaa")
+
+    npda_design = NPDADesign(
+        1, "$", [3], NPDARulebook(palindromes, max_configurations=5)
+    )
+    assert not npda_design.accepts("ab")
+    with pytest.raises(LimitExceeded):
+        npda_design.accepts("aaaaaa")
+
+    # every configuration is expanded once, however many paths reach it
+    npda_design = NPDADesign(1, "$", [3], NPDARulebook(palindromes))
+    assert npda_design.accepts("ab" * 200 + "ba" * 200)
+
+    # equal stacks are interned, whichever rules built them
+    configurations = npda_design.to_npda.read_string("abb").current_configurations
+    stacks = {}
+    for configuration in configurations:
+        stack = stacks.setdefault(configuration.stack, configuration.stack)
+        assert stack is configuration.stack
+    assert len(stacks) < len(configurations)
+
+
+def test_pda_feed():
+    dpda = DPDADesign(1, "$", [1], rulebook).to_dpda
+    assert dpda.feed("(()").feed(b"(())").feed(memoryview(b")")).finish()
+    assert not dpda.feed("(").finish()
+    dpda.feed("))")
+    # once stuck, later chunks are not read
+    assert dpda.is_stuck
+    assert not dpda.feed("()" * 100000).finish()
+
+    npda = NPDADesign(1, "$", [3], NPDARulebook(palindromes)).to_npda
+    assert npda.feed("ab").feed(b"b").feed("a").finish()
+    assert not npda.is_stuck
+    npda = NPDADesign(1, "$", [3], NPDARulebook(palindromes)).to_npda
+    assert not npda.feed("ac").finish()
+    assert npda.is_stuck
+    assert not npda.feed("ca").finish()
+
+    # nor decoded, a released view would raise if it were
+    released = memoryview(b"()")
+    released.release()
+    assert not dpda.feed(released).finish()
+    assert not npda.feed(released).finish()
@@ -0,0 +1,89 @@
+import pickle
+import struct
+
+import pytest
+
+from computation.automata.charclass import CharClass
+from computation.automata.nfa import NFASimulation
+from computation.automata.pattern import (
+    CharacterClass,
+    Concatenate,
+    Literal,
+    Repeat,
+)
+from computation.automata.serialization import HEADER, dump, dumps, load, loads
+from computation.exceptions import InvalidFormat
+
+# [_a-zα-ω][0-9_a-zα-ω]*!
+pattern = Concatenate(
+    Concatenate(
+        CharacterClass(CharClass.of("a-z", "_", "α-ω")),
+        Repeat(CharacterClass(CharClass.of("a-z", "0-9", "_", "α-ω"))),
+    ),
+    Literal("!"),
+)
+compiled = NFASimulation(pattern.to_nfa_design, minimize=True).to_dfa_design.compile()
+strings = ["", "a!", "snake_1!", "λ2!", "1a!", "ab", "a!!", "A!"]
+
+
+def test_dumps_loads():
+    data = dumps(compiled)
+    assert data[:4] == b"CDFA"
+    assert len(data) == (
+        HEADER.size
+        + 3 * 4 * len(compiled.lows)
+        + 4 * len(compiled.table)
+        + (compiled.state_count + 7) // 8
+    )
+
+    loaded = loads(data)
+    assert isinstance(loaded.table, memoryview)
+    assert loaded.state_count == compiled.state_count
+    for string in strings:
+        assert loaded.accepts(string) == compiled.accepts(string)
+
+    # pickling copies the views out
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    assert unpickled.accepts("snake_1!")
+
+
+def test_dump_load(tmp_path):
+    path = str(tmp_path / "identifier.dfa")
+    dump(compiled, path)
+    loaded = load(path)
+    for string in strings:
+        assert loaded.accepts(string) == compiled.accepts(string)
+        assert loaded.accepts(string.encode("latin-1", "replace")) == (
+            compiled.accepts(string.encode("latin-1", "replace"))
+        )
+
+
+def test_invalid_format():
+    data = dumps(compiled)
+    with pytest.raises(InvalidFormat):
+        loads(b"XDFA" + data[4:])
+    with pytest.raises(InvalidFormat):
+        loads(data[:4] + b"\x02\x00" + data[6:])
+    with pytest.raises(InvalidFormat):
+        loads(data[:-1])
+    with pytest.raises(InvalidFormat):
+        loads(data[:10])
+
+
+def test_out_of_range():
+    data = bytearray(dumps(compiled))
+    start, state_count, width, intervals = struct.unpack_from("<IIII", data, 8)
+    table = HEADER.size + 3 * 4 * intervals
+
+    for offset, value in [
+        (8, state_count),  # start
+        (16, 0),  # width
+        (table, state_count),
+        (table + 4, -1),
+        (table - 4, width),  # last column
+        (table - 4, -1),
+    ]:
+        patched = bytearray(data)
+        struct.pack_into("<i", patched, offset, value)
+        with pytest.raises(InvalidFormat):
+            loads(patched)
@@ -0,0 +1,49 @@
+from computation.automata.dfa import DFADesign, DFARulebook
+from computation.automata.farule import FARule
+from computation.automata.pattern import Concatenate, Literal, Repeat
+from computation.automata.stream import Stream, scan_file
+
+# strings over a and b containing "ab"
+dfa_design = DFADesign(
+    1,
+    [3],
+    DFARulebook(
+        [
+            FARule(1, "a", 2),
+            FARule(1, "b", 1),
+            FARule(2, "a", 2),
+            FARule(2, "b", 3),
+            FARule(3, "a", 3),
+            FARule(3, "b", 3),
+        ]
+    ),
+)
+
+
+def test_stream():
+    stream = Stream(dfa_design.compile())
+    assert not stream.feed(b"bba").finish()
+    assert stream.feed(memoryview(b"bb")).finish()
+    assert stream.feed("aa").finish()
+    assert stream.feed(b"c").is_stuck
+    assert not stream.feed(b"ab").finish()
+
+    pattern = Concatenate(Literal("a"), Repeat(Literal("b")))
+    for matcher in [pattern.compile(), pattern.to_nfa_design.to_bit_nfa]:
+        stream = Stream(matcher)
+        assert stream.feed(b"ab").feed("bb").finish()
+        assert stream.feed(b"a").is_stuck
+
+
+def test_scan_file(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"b" * 1000 + b"ab" + b"a" * 1000)
+    compiled = dfa_design.compile()
+    assert scan_file(compiled, str(path), chunk_size=64)
+
+    path.write_bytes(b"b" * 1000 + b"c" + b"ab")
+    assert not scan_file(compiled, str(path), chunk_size=64)
+
+    path.write_bytes(b"")
+    assert not scan_file(compiled, str(path))
+    assert scan_file(Repeat(Literal("a")).compile(), str(path))
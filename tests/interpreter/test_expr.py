@@ -13,6 +13,7 @@ def test_number():
     assert Number(3) != Number(4)
     assert Number(2) < Number(4)
     assert Number(4) > Number(2)
+    assert not hasattr(Number(3), "__dict__")
 
 
 def test_boolean():
@@ -28,6 +29,7 @@ def test_add():
     while expr.reducible:
         expr = expr.reduce(en)
     assert expr == Number(3)
+    assert not hasattr(Add(Number(1), Number(2)), "__dict__")
 
 
 def test_mul():
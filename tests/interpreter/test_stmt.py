@@ -16,11 +16,13 @@ def test_donothing():
     assert str(DoNothing()) == "do-nothing"
     assert DoNothing() != 1
     assert DoNothing().evaluate({"x": 1}) == {"x": 1}
+    assert not hasattr(DoNothing(), "__dict__")
 
 
 def test_assign():
     st = Assign("x", Add(Variable("x"), Number(1)))
     assert str(st) == "x = x + 1"
+    assert not hasattr(st, "__dict__")
     en = {"x": Number(2)}
     while st.reducible:
         st, en = st.reduce(en)
@@ -1,4 +1,4 @@
-from computation.utils import detect
+from computation.utils import detect, group_by
 
 
 def test_detect():
@@ -6,3 +6,8 @@ def test_detect():
     assert detect([1, 2, 3], lambda x: False) is None
     assert detect([1, 2, 3], lambda x: True) == 1
     assert detect([], lambda x: True) is None
+
+
+def test_group_by():
+    assert group_by([1, 2, 3, 4], lambda x: x % 2) == {1: [1, 3], 0: [2, 4]}
+    assert group_by([], lambda x: x) == {}
@@ -37,3 +37,9 @@ def test_rule():
     )
     dtm.run()
     assert dtm.is_stuck
+
+
+def test_slots():
+    configuration = TMConfiguration(1, Tape(["1"], "0", []))
+    for instance in [rulebook.rules[0], configuration, configuration.tape]:
+        assert not hasattr(instance, "__dict__")